@@ -4,6 +4,8 @@ from typing import ClassVar, Iterable
 from app.behaviours.logic.movement_utils import MovementUtils
 from app.behaviours.types import MessageTypeHandlersDict, BehaviourAction, HandlersMap
 from app.core.event_bus.bus import EventBus, bus
+from app.engine.grid.flow_field import FlowFields
+from app.engine.grid.pathfinding import Pathfinder
 from app.protocols.engine.grid.grid_protocol import GridProtocol
 from app.protocols.engine.message_broker.broker_protocol import MessageBrokerProtocol
 from app.protocols.objects.actor_protocol import ActorProtocol
@@ -28,6 +30,8 @@ def register_message_handler (message: MessageTypes, for_: Iterable[type] | type
 # Base Behaviour class
 class Behaviour:
     _movement_utils = None
+    _pathfinder = None
+    _flow_fields = None
     name: ClassVar[Behaviours] = Behaviours.BEHAVIOUR
     message_handlers: ClassVar[HandlersMap] = {}
     supported_receivers = (ActorProtocol,)
@@ -128,6 +132,20 @@ class Behaviour:
 
         return cls._movement_utils
 
+    @classmethod
+    def get_pathfinder(cls) -> Pathfinder:
+        if cls._pathfinder is None:
+            cls._pathfinder = Pathfinder(cls.get_grid())
+
+        return cls._pathfinder
+
+    @classmethod
+    def get_flow_fields(cls) -> FlowFields:
+        if cls._flow_fields is None:
+            cls._flow_fields = FlowFields(cls.get_grid())
+
+        return cls._flow_fields
+
     @classmethod
     def register_handlers(cls):
         pass
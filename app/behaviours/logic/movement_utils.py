@@ -1,7 +1,8 @@
 from app.behaviours.types import BufferedMoverState
-from app.config import UnitStates
+from app.config import Behaviours, UnitStates
 from app.components.geometry.types import Orientations
 from app.core.vectors import CustomVec2i, CustomVec2f
+from app.engine.grid.move_resolver import MoveResolver
 from app.engine.message_broker.types import Message, MessageBody, MessageTypes, PushedByPayload, Payload
 from app.protocols.engine.grid.grid_protocol import GridProtocol
 from app.protocols.engine.message_broker.broker_protocol import MessageBrokerProtocol
@@ -14,6 +15,7 @@ class MovementUtils:
     def __init__(self, grid: GridProtocol, messenger: MessageBrokerProtocol):
         self._grid = grid
         self._messenger = messenger
+        self._move_resolver = MoveResolver(grid)
 
     def calculate_buffered_move(
             self,
@@ -89,7 +91,8 @@ class MovementUtils:
             to_place = coordinate_holder.coordinates + direction
             result = self._grid.is_may_be_occupied(coordinate_holder, to_place)
             self.inform_about_occupation(coordinate_holder, result, direction, force)
-            return result.placed
+            # a tile held only by movers may be free once the tick's moves are resolved together
+            return result.placed or (bool(result.blocked) and all(self._is_mover(actor) for actor in result.blocked))
 
         return True
 
@@ -105,6 +108,31 @@ class MovementUtils:
 
         return result.placed
 
+    def request_move(self, coordinate_holder: CoordinateHolderProtocol, direction: CustomVec2i, force: int) -> bool:
+        """
+        Queue a step for commit_moves, where every step asked for during the tick is settled
+        together. Always True: whether the step goes through is only known at commit, so
+        the pipeline does not retry moves. A refused mover is told who was in the way
+        (PUSHED_BY) and asks again on a later tick.
+        """
+        self._move_resolver.submit(coordinate_holder, direction, force)
+        return True
+
+    def pending_moves(self) -> int:
+        return len(self._move_resolver)
+
+    def commit_moves(self) -> int:
+        """Resolve and apply the queued steps, then tell whoever was in the way. Returns how many moved."""
+        moved = 0
+        for intent, result in self._move_resolver.resolve():
+            self.inform_about_occupation(intent.coordinate_holder, result, intent.direction, intent.force)
+            moved += result.placed
+        return moved
+
+    @staticmethod
+    def _is_mover(coordinate_holder: CoordinateHolderProtocol) -> bool:
+        return coordinate_holder.is_behave_as_any([Behaviours.BUFFERED_MOVER, Behaviours.DISCRETE_MOVER])
+
     @staticmethod
     def get_animation_and_textures(velocity: CustomVec2f, unit: UnitProtocol) -> tuple[UnitStates, Orientations]:
 
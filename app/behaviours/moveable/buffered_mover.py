@@ -5,7 +5,7 @@ from app.core.event_bus.bus import Strategy
 from app.core.event_bus.events import Events
 import app.core.event_bus.types as event_types
 
-from app.core.vectors import CustomVec2f
+from app.core.vectors import CustomVec2f, CustomVec2i
 from app.engine.message_broker.types import MessageTypes, AnimatePayload, StopPayload, MovePayload, PushedByPayload
 from app.protocols.objects.coordinate_holder_protocol import CoordinateHolderProtocol
 from app.protocols.objects.unit_protocol import UnitProtocol
@@ -51,7 +51,7 @@ class BufferedMover(Behaviour):
 
         coordinate_holder.behaviour_state.set(cls.name, state)
 
-        return movement_utils.try_move(coordinate_holder, moving_direction, force) if moving_direction.is_not_zero() else True
+        return movement_utils.request_move(coordinate_holder, moving_direction, force) if moving_direction.is_not_zero() else True
 
     @classmethod
     @register_message_handler (MessageTypes.PUSHED_BY, for_=(CoordinateHolderProtocol,))
@@ -117,3 +117,20 @@ class BufferedMover(Behaviour):
         coordinate_holder.behaviour_state.set(cls.name, state)
 
         return True
+
+    @classmethod
+    def follow_flow_field(cls, coordinate_holder: CoordinateHolderProtocol, goal: CustomVec2i) -> CustomVec2i:
+        """Point the intent along the shared flow field towards goal; O(1) once the field is built."""
+        direction = cls.get_flow_fields().next_step(coordinate_holder, goal)
+        state = coordinate_holder.behaviour_state.get_copy(cls.name, BufferedMoverState)
+
+        state.intent_velocity = CustomVec2f(direction.x, direction.y)
+        state.clear_velocity = SimpleVec2Bool(False, False)
+
+        state.intent_velocity_normalised = state.intent_velocity.normalized()
+        if isinstance(coordinate_holder, UnitProtocol):
+            state.intent_velocity_normalised *= coordinate_holder.stats.speed
+
+        coordinate_holder.behaviour_state.set(cls.name, state)
+
+        return direction
@@ -51,7 +51,7 @@ class BufferedMover(Behaviour):
 
         coordinate_holder.behaviour_state.set(cls.name, state)
 
-        return movement_utils.try_move(coordinate_holder, moving_direction, force) if moving_direction.is_not_zero() else True
+        return movement_utils.request_move(coordinate_holder, moving_direction, force) if moving_direction.is_not_zero() else True
 
     @classmethod
     @register_message_handler (MessageTypes.PUSHED_BY, for_=(CoordinateHolderProtocol,))
@@ -16,12 +16,12 @@ class DiscreteMover(Behaviour):
     def pushed_by(cls, coordinate_holder: CoordinateHolderProtocol, payload: PushedByPayload) -> bool:
         print(f"pushed by coordinate holder: {coordinate_holder.name}")
         if payload.force > 0:
-            return cls.get_movement_utils().try_move(coordinate_holder, payload.direction, payload.force - 1)
+            return cls.get_movement_utils().request_move(coordinate_holder, payload.direction, payload.force - 1)
         else:
             return True
 
     @classmethod
     @register_message_handler (MessageTypes.INTENTION_TO_MOVE_DISCRETE, for_=(CoordinateHolderProtocol,))
     def intention_to_move_discrete(cls, coordinate_holder: CoordinateHolderProtocol, payload: MovePayload) -> bool:
-        return cls.get_movement_utils().try_move(coordinate_holder, payload.direction, 0)
+        return cls.get_movement_utils().request_move(coordinate_holder, payload.direction, 0)
 
@@ -12,4 +12,8 @@ class NameRepository:
 
         return name
 
+    def release(self, name: str) -> None:
+        """Give a name back once its owner is gone, so it can be reused and is not kept forever."""
+        self.names.discard(name)
+
 name_repository = NameRepository()
\ No newline at end of file
@@ -3,6 +3,7 @@ from typing import List, Optional
 
 from app.behaviours.behaviour_states_store import BehaviourStateStore
 from app.collections.behaviour_collection import BehaviourCollection
+from app.collections.name_repository import name_repository
 from app.components.component import Component
 from app.core.event_bus.bus import bus
 from app.core.event_bus.events import Events
@@ -18,11 +19,15 @@ class Actor(Component, ActorProtocol):
     def __init__(self, name: str = None):
         super().__init__(name)
         self.event_bus = bus
-        self.name = name
+        # the unique id: payloads and renderers key objects by name, so two actors
+        # asking for the same name (or for none) must not end up sharing one
+        self.name = self.id
         self.behaviour_state: BehaviourStateStore = BehaviourStateStore()
         self.is_active: bool = False
         self.is_deleted: bool = False
         self.pending_actions: deque[BehaviourAction] = deque()
+        # set while the actor sits in a PendingActors set
+        self.is_pending: bool = False
         self.behaviours: BehaviourCollectionProtocol = BehaviourCollection()
 
     def activate(self) -> None:
@@ -40,6 +45,9 @@ class Actor(Component, ActorProtocol):
 
     def delete(self) -> None:
         self.event_bus.emit(Events.UnregisterActor, event_types.ObjectPayload(object_name=self.name))
+        # a deleted actor must not stay reachable through (or be scanned by) the bus
+        self.event_bus.purge_component(self)
+        name_repository.release(self.id)
         self.is_deleted = True
 
     def on_message(self, message_body: MessageBody) -> deque[BehaviourAction]:
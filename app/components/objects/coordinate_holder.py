@@ -1,5 +1,6 @@
 from typing import Self
 
+from app.collections.name_repository import name_repository
 from app.components.geometry.shape import Shape
 from app.components.physics.body import Body
 from app.core.event_bus.bus import Strategy
@@ -20,7 +21,7 @@ class CoordinateHolder(Actor, CoordinateHolderProtocol):
         self.intent_velocity: CustomVec2f = CustomVec2f.zero()
         self.coordinates: CustomVec2i = coordinates
         self.facing_direction: CustomVec2i = CustomVec2i.down()
-        self.event_bus.subscribe_component(Events.ShapeAnimationUpdate, self.sprite_animation_emitter)
+        self.event_bus.subscribe_component(self, Events.ShapeAnimationUpdate, self.sprite_animation_emitter, weak=True)
 
     def activate(self) -> None:
         self.event_bus.emit(
@@ -37,7 +38,12 @@ class CoordinateHolder(Actor, CoordinateHolderProtocol):
         )
         self.is_active = True
 
-
+    def delete(self) -> None:
+        super().delete()
+        # body and shape are the holder's own, their names go with it
+        name_repository.release(self.body.id)
+        if self.shape is not None:
+            name_repository.release(self.shape.id)
 
     def sprite_animation_emitter(self, payload: event_types.ShapeAnimationUpdatePayload) -> None:
         self.event_bus.emit(Events.SpriteAnimationUpdate, event_types.SpriteAnimationUpdatePayload(self.name, payload.animation))
@@ -1,8 +1,9 @@
-from dataclasses import dataclass
-from enum import Enum, auto
+from dataclasses import dataclass, field
+from enum import Enum, IntFlag, auto
 from typing import Self
 
 from app.components.component import Component
+from app.components.physics.footprint import Footprint
 
 
 class CollisionResponse(Enum):
@@ -10,27 +11,78 @@ class CollisionResponse(Enum):
     OVERLAP = auto()
     IGNORE = auto()
 
+
+class CollisionChannel(IntFlag):
+    """
+    Collision categories, one bit each; masks are stored in 16-bit grid layers.
+    A body belongs to one or more channels and lists the channels it blocks and overlaps.
+    """
+    NONE = 0
+    WORLD = auto()  # walls and obstacles
+    PAWN = auto()  # units and the player
+    PROJECTILE = auto()
+    AREA = auto()  # water, cursors, triggers: meant to be stood on
+    ALL = 0xFFFF
+
+
+# channels given to bodies declared with a plain response: (category, block mask, overlap mask)
+_RESPONSE_CHANNELS: dict[CollisionResponse, tuple[int, int, int]] = {
+    CollisionResponse.BLOCK: (CollisionChannel.PAWN, CollisionChannel.WORLD | CollisionChannel.PAWN, CollisionChannel.ALL),
+    CollisionResponse.OVERLAP: (CollisionChannel.AREA, CollisionChannel.NONE, CollisionChannel.ALL),
+    CollisionResponse.IGNORE: (CollisionChannel.NONE, CollisionChannel.NONE, CollisionChannel.NONE),
+}
+
+
 @dataclass
 class CollisionMatrix:
-    response: CollisionResponse
+    """
+    Two bodies block each other when each one's category is in the other's block mask,
+    and overlap when, short of blocking, each one's category is in the other's block or
+    overlap mask. Both tests are integer ANDs, so they also run over OR-ed masks of many
+    bodies at once (the grid keeps such layers per tile).
 
-    def overlaps(self, other: Self) -> bool:
-        if CollisionResponse.IGNORE in (self.response, other.response):
-            return False
+    Masks left out come from the response; response itself is then recomputed from the
+    masks: BLOCK when the body blocks any channel, OVERLAP when it only overlaps.
+    """
+    response: CollisionResponse = CollisionResponse.IGNORE
+    category: int | None = None
+    block_mask: int | None = None
+    overlap_mask: int | None = None
+    # block_mask | overlap_mask: every channel the body reacts to at all
+    contact_mask: int = field(init=False, repr=False, compare=False)
 
-        if CollisionResponse.OVERLAP in (self.response, other.response):
-            return True
+    def __post_init__(self):
+        category, block_mask, overlap_mask = _RESPONSE_CHANNELS[self.response]
+        # plain ints: IntFlag operators go through the enum machinery on every AND
+        self.category = int(category if self.category is None else self.category)
+        self.block_mask = int(block_mask if self.block_mask is None else self.block_mask)
+        self.overlap_mask = int(overlap_mask if self.overlap_mask is None else self.overlap_mask)
+        self.contact_mask = self.block_mask | self.overlap_mask
+        if not (self.category and self.contact_mask):
+            self.response = CollisionResponse.IGNORE
+        elif self.block_mask:
+            self.response = CollisionResponse.BLOCK
+        else:
+            self.response = CollisionResponse.OVERLAP
 
-        return False
+    def overlaps(self, other: Self) -> bool:
+        return bool(
+            self.category & other.contact_mask and other.category & self.contact_mask
+            and not (self.category & other.block_mask and other.category & self.block_mask)
+        )
 
     def blocks(self, other: Self) -> bool:
-        return self.response == CollisionResponse.BLOCK and other.response == CollisionResponse.BLOCK
+        return bool(self.category & other.block_mask and other.category & self.block_mask)
 
 
 class Body(Component):
-    def __init__(self, collision_matrix: CollisionMatrix = None):
+    def __init__(self, collision_matrix: CollisionMatrix = None, footprint: Footprint = None, opaque: bool = False):
         super().__init__()
         self.collision_matrix: CollisionMatrix = CollisionMatrix(response=CollisionResponse.IGNORE) if collision_matrix is None else collision_matrix
+        # tiles covered beyond the holder's own coordinates; None is a single cell
+        self.footprint: Footprint | None = footprint
+        # blocks line of sight in every tile it covers, like opaque terrain
+        self.opaque: bool = opaque
         pass
 
     def is_solid(self) -> bool:
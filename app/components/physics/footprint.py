@@ -0,0 +1,67 @@
+from typing import Self, Sequence
+
+# an edge or a stamp: (row offset from the anchor, bits) where bit i is column anchor.x - 1 + i
+FootprintRows = tuple[tuple[int, int], ...]
+
+
+class Footprint:
+    """
+    Tiles covered by a body larger than one cell, as one bitmask per row: bit i of
+    rows[j] is the tile (anchor.x + i, anchor.y + j). The anchor is the holder's
+    coordinates, the bottom-left corner of the bounding box.
+
+    Masks are compared a row at a time against the grid's occupancy rows; edges for
+    one-tile steps come from shifting the rows and are computed once per direction.
+    """
+    __slots__ = ("width", "height", "rows", "_edges", "_stamp")
+
+    def __init__(self, rows: Sequence[int], width: int):
+        if not rows or not any(rows):
+            raise ValueError("Footprint needs at least one tile")
+        if any(row >> width for row in rows):
+            raise ValueError(f"Footprint rows must fit in {width} columns")
+        self.width = width
+        self.height = len(rows)
+        self.rows: tuple[int, ...] = tuple(rows)
+        self._edges: dict[tuple[int, int], tuple[FootprintRows, FootprintRows]] = {}
+        # columns are shifted by one so that edges can reach anchor.x - 1
+        self._stamp: FootprintRows = tuple((j, row << 1) for j, row in enumerate(self.rows) if row)
+
+    @classmethod
+    def rect(cls, width: int, height: int) -> Self:
+        return cls([(1 << width) - 1] * height, width)
+
+    @classmethod
+    def from_strings(cls, lines: Sequence[str], solid: str = "#") -> Self:
+        """Rows as drawn, top line first: Footprint.from_strings(["##", "#."])."""
+        width = max(len(line) for line in lines)
+        rows = [
+            sum(1 << i for i, char in enumerate(line) if char == solid)
+            for line in reversed(lines)
+        ]
+        return cls(rows, width)
+
+    def stamp(self) -> FootprintRows:
+        """Every tile of the footprint, in the (row offset, shifted bits) form of edges()."""
+        return self._stamp
+
+    def edges(self, dx: int, dy: int) -> tuple[FootprintRows, FootprintRows]:
+        """
+        Tiles entered (leading) and left (trailing) by a step of at most one tile per axis,
+        relative to the anchor before the step.
+        """
+        key = (dx, dy)
+        edges = self._edges.get(key)
+        if edges is None:
+            before = [0] * (self.height + 2)
+            after = [0] * (self.height + 2)
+            for j, row in enumerate(self.rows):
+                before[j + 1] = row << 1
+                after[j + 1 + dy] = row << (1 + dx)
+            leading = tuple((j - 1, a & ~b) for j, (a, b) in enumerate(zip(after, before)) if a & ~b)
+            trailing = tuple((j - 1, b & ~a) for j, (a, b) in enumerate(zip(after, before)) if b & ~a)
+            edges = self._edges[key] = (leading, trailing)
+        return edges
+
+    def __len__(self) -> int:
+        return sum(row.bit_count() for row in self.rows)
@@ -4,6 +4,17 @@ from enum import Enum, auto
 FPS = 60
 SCREEN_SIZE = (1440, 1000)
 TILE_SIZE = 16
+# seconds per frame spent delivering events posted from worker threads
+POSTED_EVENTS_BUDGET = 0.002
+# event trace ring buffer (--trace-bus): records kept, frame time that triggers a dump
+TRACE_CAPACITY = 65536
+TRACE_HITCH_THRESHOLD = 0.05
+# field of view of the player's units, in tiles, and the faction bit they see for
+VIEW_RADIUS = 8
+PLAYER_FACTION = 0
+# rounds of move resolution per tick: steps asked for by the units pushed in one round
+# are settled in the next, what is left after the last one waits for the next tick
+MOVE_ROUNDS = 3
 
 # Grid colors
 GRID_COLOR = (200, 200, 200)
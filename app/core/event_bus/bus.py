@@ -1,10 +1,18 @@
+import heapq
+import inspect
+import itertools
 import time
-from collections import defaultdict, deque
+import weakref
+from collections import deque
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Callable, Any
+from typing import Callable, Any, Hashable, Iterable, Iterator
 
-from app.core.event_bus.events import Events
+from app.core.event_bus.events import Events, EventCoalescingKeys
+from app.core.event_bus.profiler import BusProfiler
+from app.core.event_bus.route_trie import RouteTrie, is_pattern, pattern_matches
+from app.core.event_bus.trace import EventTrace
 from app.protocols.objects.component_protocol import ComponentProtocol
 
 
@@ -20,38 +28,98 @@ class Envelope:
     strategy: Strategy
     route: str = ''
     ttl_s: float | None = 6.0
-    ts: float = field(default_factory=time.time)
+    ts: float = field(default_factory=time.monotonic)
 
-@dataclass(frozen=True, slots=True)
+    @property
+    def expires_at(self) -> float | None:
+        return None if self.ttl_s is None else self.ts + self.ttl_s
+
+@dataclass(slots=True, eq=False)
 class Subscription:
+    """Handle returned by subscribe(); unsubscribe_handle() drops it in amortised O(1)."""
     callback: Callable[[Any], None]
-    route: str = ''  # empty = subscribe to all routes
+    route: str = ''  # empty = subscribe to all routes; may hold '+'/'#' wildcards
+    weak: bool = False  # callback is a weakref; call it to get the target
+    event: Events | None = None
+    active: bool = True  # cleared on unsubscribe; the bucket is compacted lazily
+
+    def resolve(self) -> Callable[[Any], None] | None:
+        """Return the callable to invoke, or None if a weak target was collected."""
+        return self.callback() if self.weak else self.callback
+
+    def is_for(self, cb: Callable[[Any], None]) -> bool:
+        # bound methods are recreated on every attribute access, so compare by equality
+        return self.resolve() == cb
+
+    def is_owned_by(self, owner: object) -> bool:
+        return getattr(self.resolve(), "__self__", None) is owner
 
 MAX_BACKLOG = 1000
+# coalescing key of a payload that lacks the declared attribute
+_MISSING = object()
 
 class EventBus:
 
     def __init__(self):
-        self._subs: dict[Events, list[Subscription]] = defaultdict(list)
-        self._backlog: dict[Events, deque[Envelope]] = defaultdict(lambda: deque(maxlen=MAX_BACKLOG))
+        # route='' listeners, per event
+        self._wildcard_subs: dict[Events, tuple[Subscription, ...]] = {}
+        # exact-route listeners, per event and route
+        self._routed_subs: dict[Events, dict[str, tuple[Subscription, ...]]] = {}
+        # hierarchical pattern listeners ('layer/objects/#', 'layer/+/actor-42'), per event
+        self._pattern_subs: dict[Events, RouteTrie[tuple[Subscription, ...]]] = {}
+        # inactive handles still sitting in a bucket, per (event, route)
+        self._cancelled: dict[tuple[Events, str], int] = {}
+        # undelivered AtLeastOnce envelopes, per event and emit route ('' = broadcast)
+        self._backlog: dict[Events, dict[str, deque[Envelope]]] = {}
+        # (expires_at, seq, event, route, envelope) min-heap over the whole backlog
+        self._backlog_expiry: list[tuple[float, int, Events, str, Envelope]] = []
+        self._backlog_seq = itertools.count()
         self._retained: dict[tuple[Events, str | None], Envelope] = {}
+        # deferred mode: emits of events with a coalescing key are queued until flush()
+        # and coalesced per key; every other event is still delivered at once
+        self._coalescing_keys: dict[Events, str] = dict(EventCoalescingKeys)
+        self._defer_depth: int = 0
+        self._deferred: dict[Hashable, tuple[Events, Any, Strategy, str]] = {}
+        self._deferred_seq = itertools.count()
+        self.profiler: BusProfiler | None = None
+        self.trace: EventTrace | None = None
+        # events posted from worker threads; deque append/popleft are atomic, so
+        # posting takes no lock and the dispatch path stays lock-free
+        self._posted: deque[tuple[Events, Any, Strategy, str]] = deque()
 
-    def subscribe(self, ev: Events, cb: Callable[[Any], None], route: str = ''):
+    def subscribe(self, ev: Events, cb: Callable[[Any], None], route: str = '', weak: bool = False) -> Subscription:
         """
-        Subscribe to an event with optional route filtering.
+        Subscribe to an event with optional route filtering. Returns a handle for unsubscribe_handle().
         - route='': subscribes to all routes (broadcast and targeted)
         - route='comp_123': only receives events routed to 'comp_123'
+        - route='layer/objects/#': receives every route under 'layer/objects' (and itself)
+        - route='layer/+/actor-42': '+' matches exactly one route segment
+        - weak=True: the bus does not keep cb's owner alive; the subscription is
+          dropped automatically once the owner is garbage collected
         """
-        sub = Subscription(callback=cb, route=route)
-        self._subs[ev].append(sub)
+        sub = self._add(ev, cb, route, weak)
         self._drain_backlog(ev, route)
+        return sub
 
-    def subscribe_component(self, component: ComponentProtocol, ev: Events, cb: Callable[[Any], None]):
+    def subscribe_many(self,
+                       handlers: Iterable[tuple[Events, Callable[[Any], None]]],
+                       route: str = '',
+                       weak: bool = False) -> list[Subscription]:
+        """
+        Subscribe several (event, callback) pairs at once. The backlog is drained once
+        per event after everything is registered, instead of after every subscribe.
+        """
+        subs = [self._add(ev, cb, route, weak) for ev, cb in handlers]
+        for ev in dict.fromkeys(sub.event for sub in subs):
+            self._drain_backlog(ev, route)
+        return subs
+
+    def subscribe_component(self, component: ComponentProtocol, ev: Events, cb: Callable[[Any], None], weak: bool = False):
         """
         Convenience method: subscribe using a component's ID as the route.
         Automatically uses component.id as the route filter.
         """
-        self.subscribe(ev, cb, route=component.id)
+        self.subscribe(ev, cb, route=component.id, weak=weak)
 
     def unsubscribe_component(self, component: ComponentProtocol, ev: Events, cb: Callable[[Any], None]) -> bool:
         """
@@ -66,40 +134,51 @@ class EventBus:
         - If route is None: removes all subscriptions with this callback
         - If route is specified: only removes subscriptions matching both callback and route
         """
-        subs = self._subs.get(ev)
-        if not subs:
-            return False
+        return self._remove_callback(ev, cb, route) > 0
 
-        removed = False
-        if route is None:
-            # remove all subscriptions with this callback
-            original_len = len(subs)
-            subs[:] = [s for s in subs if s.callback is not cb]
-            removed = len(subs) < original_len
+    def unsubscribe_handle(self, sub: Subscription) -> bool:
+        """
+        Drop the subscription behind a handle. The handle is deactivated at once and
+        skipped on delivery; its bucket is rebuilt only once more than half of it is
+        inactive, which keeps removal amortised O(1). Returns False if already removed.
+        """
+        if not sub.active:
+            return False
+        sub.active = False
+        key = (sub.event, sub.route)
+        cancelled = self._cancelled.get(key, 0) + 1
+        if cancelled * 2 > len(self._bucket(sub.event, sub.route)):
+            self._remove_where(sub.event, sub.route, lambda s: False)
         else:
-            # remove only subscriptions matching both callback and route
-            original_len = len(subs)
-            subs[:] = [s for s in subs if not (s.callback is cb and s.route == route)]
-            removed = len(subs) < original_len
+            self._cancelled[key] = cancelled
+        return True
 
-        # tidy up empty lists to keep dict small
-        if not subs:
-            self._subs.pop(ev, None)
-        return removed
+    def unsubscribe_many(self, subs: Iterable[Subscription]) -> int:
+        """Drop several handles. Returns the number that were still active."""
+        return sum(self.unsubscribe_handle(sub) for sub in subs)
 
     def unsubscribe_all(self, cb: Callable[[Any], None]) -> int:
         """Remove a callback from all events. Returns the number of removals."""
         removed = 0
-        empty_keys = []
-        for ev, subs in self._subs.items():
-            # remove all occurrences (defensive)
-            count_before = len(subs)
-            subs[:] = [s for s in subs if s.callback is not cb]
-            removed += count_before - len(subs)
-            if not subs:
-                empty_keys.append(ev)
-        for ev in empty_keys:
-            self._subs.pop(ev, None)
+        for ev in set(self._wildcard_subs) | set(self._routed_subs) | set(self._pattern_subs):
+            removed += self._remove_callback(ev, cb)
+        return removed
+
+    def purge_component(self, component: ComponentProtocol) -> int:
+        """
+        Drop everything a component subscribed: all routes keyed by its id, and any
+        wildcard or pattern listener bound to it. Touches one bucket per event plus the
+        wildcard and pattern buckets, never the other components' exact routes.
+        Returns the number of removals.
+        """
+        removed = 0
+        for ev in list(self._routed_subs):
+            removed += self._remove_where(ev, component.id, lambda s: True)
+        for ev in list(self._wildcard_subs):
+            removed += self._remove_where(ev, '', lambda s: s.is_owned_by(component))
+        for ev, patterns in list(self._pattern_subs.items()):
+            for pattern in list(patterns):
+                removed += self._remove_where(ev, pattern, lambda s: s.is_owned_by(component))
         return removed
 
     def emit(self,
@@ -111,66 +190,339 @@ class EventBus:
         Emit an event with optional routing.
         - route='': broadcasts to all subscribers
         - route='comp_123': only delivered to subscribers listening to 'comp_123' or ''
+        While the bus is deferred, events with a coalescing key are queued and delivered
+        on flush().
         """
-        env = Envelope(ev, payload, strategy, route)
+        if self._defer_depth and ev in self._coalescing_keys:
+            self._queue_deferred(ev, payload, strategy, route)
+            return
 
-        subs = self._subs.get(ev, [])
-        # filter subscribers that match the route
-        matching_subs = self._filter_matching_subs(subs, env.route)
+        self._dispatch(ev, payload, strategy, route)
 
-        if not matching_subs:
-            if strategy is Strategy.AtMostOnce:
-                return
-            # buffer for later delivery
-            self._backlog[ev].append(env)
+    def post(self,
+             ev: Events,
+             payload: Any,
+             strategy: Strategy = Strategy.AtMostOnce,
+             route: str = '',):
+        """
+        Thread-safe emit: queue the event for delivery on the main thread.
+        Subscribers are called from drain_posted(), never from the posting thread.
+        """
+        self._posted.append((ev, payload, strategy, route))
+
+    def drain_posted(self, budget_s: float | None = None) -> int:
+        """
+        Emit events posted from other threads, in posting order. Must run on the main
+        thread. Stops once budget_s has elapsed and leaves the rest for the next call.
+        Returns the number of events emitted.
+        """
+        posted = self._posted
+        if not posted:
+            return 0
+        deadline = None if budget_s is None else time.perf_counter() + budget_s
+        drained = 0
+        while posted:
+            ev, payload, strategy, route = posted.popleft()
+            self.emit(ev, payload, strategy, route)
+            drained += 1
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+        return drained
+
+    def set_coalescing_key(self, ev: Events, attr: str | None):
+        """
+        Declare the payload attribute that identifies what an event is about.
+        While deferred, such events are queued and only the last one per key is
+        delivered. None disables coalescing, and deferral with it.
+        """
+        if attr is None:
+            self._coalescing_keys.pop(ev, None)
+        else:
+            self._coalescing_keys[ev] = attr
+
+    def enable_profiling(self) -> BusProfiler:
+        """
+        Start recording per-event counters and callback latency.
+        The profiler hooks are bound on this instance only; until this is called
+        emit runs the plain class methods with no instrumentation cost.
+        """
+        if self.profiler is None:
+            self.profiler = BusProfiler(self)
+            self._dispatch = self.profiler.dispatch
+            self._deliver_to_matching = self.profiler.deliver
+            self._buffer = self.profiler.buffer
+            self._queue_deferred = self.profiler.queue_deferred
+        return self.profiler
+
+    def disable_profiling(self):
+        if self.profiler is None:
             return
+        for hook in ('_dispatch', '_deliver_to_matching', '_buffer', '_queue_deferred'):
+            vars(self).pop(hook, None)
+        self.profiler = None
 
-        # deliver now
-        self._deliver_to_matching(matching_subs, env)
+    def enable_tracing(self, trace: EventTrace | None = None) -> EventTrace:
+        """
+        Record every emit into a ring buffer. Like profiling, the hook is bound on
+        this instance only, so an untraced bus pays nothing for it.
+        """
+        if self.trace is None:
+            self.trace = trace if trace is not None else EventTrace()
+            self.emit = self._traced_emit
+        return self.trace
+
+    def disable_tracing(self):
+        vars(self).pop('emit', None)
+        self.trace = None
+
+    def _traced_emit(self,
+                     ev: Events,
+                     payload: Any,
+                     strategy: Strategy = Strategy.AtMostOnce,
+                     route: str = '',):
+        self.trace.record(ev, payload, strategy, route)
+        EventBus.emit(self, ev, payload, strategy, route)
+
+    @contextmanager
+    def deferred(self) -> Iterator[None]:
+        """
+        Queue the emits of coalescable events (see EventCoalescingKeys) made inside the
+        block and flush them once it exits; other events are not held back. Nested
+        blocks flush together with the outermost one.
+        """
+        self._defer_depth += 1
+        try:
+            yield
+        finally:
+            self._defer_depth -= 1
+            if not self._defer_depth:
+                self.flush()
+
+    def flush(self) -> int:
+        """Deliver queued deferred events in emit order. Returns how many were dispatched."""
+        pending = self._deferred
+        if not pending:
+            return 0
+        self._deferred = {}
+        for ev, payload, strategy, route in pending.values():
+            self._dispatch(ev, payload, strategy, route)
+        return len(pending)
 
     # ---- internals ----
+    def _queue_deferred(self, ev: Events, payload: Any, strategy: Strategy, route: str):
+        value = getattr(payload, self._coalescing_keys[ev], _MISSING)
+        if value is _MISSING:
+            key = next(self._deferred_seq)  # nothing to coalesce on: queued as is
+        else:
+            key = (ev, route, value)
+            # re-insert at the end: the surviving event keeps its place after
+            # anything emitted since the one it replaces (e.g. an unregister)
+            self._deferred.pop(key, None)
+        self._deferred[key] = (ev, payload, strategy, route)
+
+    def _dispatch(self, ev: Events, payload: Any, strategy: Strategy, route: str):
+        # fast path: decide "anyone listening?" from the buckets alone, so an unheard
+        # AtMostOnce emit builds no Envelope, reads no clock and allocates nothing
+        wildcard = self._wildcard_subs.get(ev)
+        routed = self._routed_subs.get(ev)
+        patterns = self._pattern_subs.get(ev)
+        if not wildcard and not patterns and not (routed and (not route or route in routed)):
+            self._unheard(ev, payload, strategy, route)
+            return
+
+        buckets = self._matching_buckets(ev, route)
+        if patterns and not any(buckets):
+            self._unheard(ev, payload, strategy, route)
+            return
+
+        # deliver now
+        self._deliver_to_matching(buckets, ev, payload, strategy)
+
+    def _unheard(self, ev: Events, payload: Any, strategy: Strategy, route: str):
+        if strategy is Strategy.AtMostOnce:
+            return
+        # buffer for later delivery
+        self._buffer(Envelope(ev, payload, strategy, route))
+
     @staticmethod
     def _route_matches(sub_route: str, emit_route: str) -> bool:
         """
         Check if a subscription route matches an emitted route.
         - sub_route='': matches all emitted routes (broadcast listener)
         - emit_route='': broadcasts to all subscriptions
+        - sub_route with '+'/'#': hierarchical pattern match
         - otherwise: exact match required
         """
         if sub_route == '':
             return True  # the subscriber listens to everything
         if emit_route == '':
             return True  # broadcast event reaches all
-        return sub_route == emit_route
+        return sub_route == emit_route or (is_pattern(sub_route) and pattern_matches(sub_route, emit_route))
 
-    @staticmethod
-    def _filter_matching_subs(subs: list[Subscription], emit_route: str) -> list[Subscription]:
-        """Return only subscriptions that match the emitted route."""
-        return [s for s in subs if EventBus._route_matches(s.route, emit_route)]
+    def _matching_buckets(self, ev: Events, emit_route: str) -> tuple[tuple[Subscription, ...], ...]:
+        """
+        Return the subscription buckets an emit on this route reaches.
+        A routed emit touches its own bucket, the patterns matching it (found through
+        the trie) and the wildcard bucket; exact-route listeners come first so that
+        FirstWin prefers the addressed component.
+        """
+        wildcard = self._wildcard_subs.get(ev, ())
+        routed = self._routed_subs.get(ev)
+        patterns = self._pattern_subs.get(ev)
+        if emit_route:
+            exact = routed.get(emit_route, ()) if routed else ()
+            if patterns:
+                return exact, *patterns.match(emit_route), wildcard
+            return exact, wildcard
+        if not routed and not patterns:
+            return (wildcard,)
+        return *(routed.values() if routed else ()), *(patterns.values() if patterns else ()), wildcard
 
     @staticmethod
-    def _deliver_to_matching(subs: list[Subscription], env: Envelope):
-        """Deliver envelope to matching subscriptions."""
-        for sub in list(subs):
-            sub.callback(env.payload)
-            if env.strategy is Strategy.FirstWin:
-                return
+    def _deliver_to_matching(buckets: tuple[tuple[Subscription, ...], ...], ev: Events, payload: Any, strategy: Strategy):
+        """Deliver payload to matching subscriptions."""
+        for bucket in buckets:
+            for sub in bucket:
+                if not sub.active:
+                    continue
+                cb = sub.callback() if sub.weak else sub.callback
+                if cb is None:
+                    continue  # owner collected, its purge callback is pending
+                cb(payload)
+                if strategy is Strategy.FirstWin:
+                    return
+
+    def _add(self, ev: Events, cb: Callable[[Any], None], route: str, weak: bool) -> Subscription:
+        sub = self._make_weak_subscription(ev, cb, route) if weak else Subscription(callback=cb, route=route, event=ev)
+        # buckets are immutable tuples: emit iterates them without copying,
+        # and a callback that (un)subscribes mid-delivery can't disturb it
+        if route:
+            buckets = self._pattern_subs.setdefault(ev, RouteTrie()) if is_pattern(route) else self._routed_subs.setdefault(ev, {})
+            buckets[route] = buckets.get(route, ()) + (sub,)
+        else:
+            self._wildcard_subs[ev] = self._wildcard_subs.get(ev, ()) + (sub,)
+        return sub
+
+    def _bucket(self, ev: Events, route: str) -> tuple[Subscription, ...]:
+        if not route:
+            return self._wildcard_subs.get(ev, ())
+        buckets = (self._pattern_subs if is_pattern(route) else self._routed_subs).get(ev)
+        return buckets.get(route, ()) if buckets else ()
+
+    def _make_weak_subscription(self, ev: Events, cb: Callable[[Any], None], route: str) -> Subscription:
+        ref_type = weakref.WeakMethod if inspect.ismethod(cb) else weakref.ref
+        bus_ref = weakref.ref(self)
+        sub: Subscription | None = None
+
+        def on_collected(_):
+            bus = bus_ref()
+            if bus is not None and sub is not None:
+                bus.unsubscribe_handle(sub)
+
+        sub = Subscription(callback=ref_type(cb, on_collected), route=route, weak=True, event=ev)
+        return sub
+
+    def _remove_callback(self, ev: Events, cb: Callable[[Any], None], route: str | None = None) -> int:
+        routes = (route,) if route is not None else ('', *self._routed_subs.get(ev, ()), *self._pattern_subs.get(ev, ()))
+        return sum(self._remove_where(ev, r, lambda s: s.is_for(cb)) for r in routes)
+
+    def _remove_where(self, ev: Events, route: str, predicate: Callable[[Subscription], bool]) -> int:
+        """
+        Remove matching subscriptions from one bucket (route='' is the wildcard bucket),
+        compacting away handles that were already deactivated.
+        """
+        self._cancelled.pop((ev, route), None)
+        if route:
+            owners = self._pattern_subs if is_pattern(route) else self._routed_subs
+            buckets = owners.get(ev)
+            if buckets is None:
+                return 0
+        else:
+            buckets = self._wildcard_subs
+            route = ev
+        subs = buckets.get(route)
+        if not subs:
+            return 0
+        kept = []
+        removed = 0
+        for sub in subs:
+            if not sub.active:
+                continue
+            if predicate(sub):
+                sub.active = False
+                removed += 1
+            else:
+                kept.append(sub)
+        kept = tuple(kept)
+        if kept:
+            buckets[route] = kept
+        else:
+            # tidy up empty buckets to keep dicts small
+            del buckets[route]
+            if buckets is not self._wildcard_subs and not buckets:
+                del owners[ev]
+        return removed
+
+    def _buffer(self, env: Envelope):
+        self._expire_backlog()
+        by_route = self._backlog.setdefault(env.event, {})
+        q = by_route.get(env.route)
+        if q is None:
+            q = by_route[env.route] = deque(maxlen=MAX_BACKLOG)
+        q.append(env)
+        expires_at = env.expires_at
+        if expires_at is not None:
+            heapq.heappush(self._backlog_expiry, (expires_at, next(self._backlog_seq), env.event, env.route, env))
+
+    def _expire_backlog(self):
+        """
+        Drop every envelope whose ttl has passed. Only expired heap entries are touched;
+        entries for envelopes already delivered or evicted by MAX_BACKLOG are discarded.
+        """
+        heap = self._backlog_expiry
+        if not heap or heap[0][0] > time.monotonic():
+            return
+        now = time.monotonic()
+        while heap and heap[0][0] <= now:
+            _, _, ev, route, env = heapq.heappop(heap)
+            by_route = self._backlog.get(ev)
+            q = by_route.get(route) if by_route else None
+            if not q:
+                continue
+            # envelopes of one route arrive in ts order, so with a shared ttl the
+            # expired one is at the front; a shorter-lived one behind it is skipped on drain
+            if q[0] is env:
+                q.popleft()
+            if not q:
+                del by_route[route]
+                if not by_route:
+                    del self._backlog[ev]
 
     def _drain_backlog(self, ev: Events, new_sub_route: str = ''):
-        """Drain the backlog for a specific event, filtering by the new subscription's route."""
-        if not self._subs.get(ev):
+        """Deliver the backlog the new subscription could receive: the routes it matches plus broadcasts."""
+        self._expire_backlog()
+        by_route = self._backlog.get(ev)
+        if not by_route:
             return
-        q = self._backlog[ev]
-        # single-pass drain snapshot to avoid infinite loops
-        n = len(q)
-        for _ in range(n):
-            env = q.popleft()
-            if env.ttl_s is not None and time.time() - env.ts > env.ttl_s:
-                continue  # expired
-            # only deliver if the new subscription had matched
-            if self._route_matches(new_sub_route, env.route):
-                matching_subs = self._filter_matching_subs(self._subs[ev], env.route)
-                self._deliver_to_matching(matching_subs, env)
+        if not new_sub_route:
+            routes = tuple(by_route)
+        elif is_pattern(new_sub_route):
+            routes = ('', *(r for r in by_route if r and pattern_matches(new_sub_route, r)))
+        else:
+            routes = (new_sub_route, '')
+        now = time.monotonic()
+        for route in routes:
+            # take the bucket first: envelopes buffered during delivery start a fresh one
+            q = by_route.pop(route, None)
+            if not q:
+                continue
+            for env in q:
+                expires_at = env.expires_at
+                if expires_at is not None and expires_at <= now:
+                    continue
+                self._deliver_to_matching(self._matching_buckets(ev, env.route), ev, env.payload, env.strategy)
+        if not by_route and self._backlog.get(ev) is by_route:
+            del self._backlog[ev]
 
 
 # SINGLE shared bus
@@ -1,6 +1,6 @@
 from typing import Dict, Callable, Any
 
-from app.core.event_bus.bus import bus, EventBus
+from app.core.event_bus.bus import bus, EventBus, Subscription
 from app.core.event_bus.events import Events
 
 
@@ -9,18 +9,34 @@ class Consumer:
     def __init__(self):
         self._event_bus: EventBus = bus
         self._handlers: Dict[Events, Callable[[Any], None]] = {}
+        self._subscriptions: Dict[Events, Subscription] = {}
 
     def register_event_bus(self, event_bus: EventBus):
+        self.unregister_event_bus()
         self._event_bus = event_bus
-        for event_type, handler in self._handlers.items():
-            self._event_bus.subscribe(event_type, handler)
+        # one batched call: every handler is in place before the backlog is drained
+        subscriptions = self._event_bus.subscribe_many(self._handlers.items())
+        self._subscriptions = dict(zip(self._handlers, subscriptions))
+
+    def unregister_event_bus(self):
+        """Drop every handler subscription from the current bus in one call; handlers are kept."""
+        if self._event_bus:
+            self._event_bus.unsubscribe_many(self._subscriptions.values())
+        self._subscriptions = {}
 
     def register_handler(self, event_type: Events, handler: Callable[[Any], None]):
+        self.unregister_handler(event_type)
         self._handlers[event_type] = handler
         if self._event_bus:
-            self._event_bus.subscribe(event_type, handler)
+            self._subscriptions[event_type] = self._event_bus.subscribe(event_type, handler)
 
-    def unregister_handler(self, event_type: Events, handler: Callable[[Any], None]):
-        self._handlers.pop(event_type, None)
-        if self._event_bus:
-            self._event_bus.unsubscribe(event_type, handler)
+    def unregister_handler(self, event_type: Events, handler: Callable[[Any], None] | None = None) -> bool:
+        """Drop the handler of event_type; when handler is given, only if it is the one registered."""
+        registered = self._handlers.get(event_type)
+        if registered is None or (handler is not None and registered != handler):
+            return False
+        del self._handlers[event_type]
+        subscription = self._subscriptions.pop(event_type, None)
+        if self._event_bus and subscription is not None:
+            self._event_bus.unsubscribe_handle(subscription)
+        return True
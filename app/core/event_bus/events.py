@@ -6,7 +6,22 @@ class Events(Enum):
     MotionUpdate = auto()
     MousePositionUpdate = auto()
     RegisterSprite = auto()
+    RegisterCoordinateHolder = auto()
+    RegisterCoordinateHolders = auto()
     MoveCoordinateHolder = auto()
+    UnregisterCoordinateHolder = auto()
     UnregisterSprite = auto()
     RegisterActor = auto()
     UnregisterActor = auto()
+    TerrainUpdate = auto()
+    OpacityUpdate = auto()
+    FogOfWarUpdate = auto()
+
+
+# Payload attribute identifying what an event is about. While the bus is deferred,
+# only the last event per (event, route, key) is delivered on flush.
+EventCoalescingKeys: dict[Events, str] = {
+    Events.SpriteAnimationUpdate: "object_name",
+    Events.MotionUpdate: "object_name",
+    Events.MoveCoordinateHolder: "object_name",
+}
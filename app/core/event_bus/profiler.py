@@ -0,0 +1,146 @@
+import json
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Any, Callable, TYPE_CHECKING
+
+from app.core.event_bus.events import Events
+
+if TYPE_CHECKING:
+    from app.core.event_bus.bus import EventBus, Envelope, Strategy, Subscription
+
+# upper bounds of the latency buckets, in microseconds: 1, 2, 4, ... ~1s, then overflow
+LATENCY_BUCKETS_US: tuple[int, ...] = tuple(2 ** i for i in range(21))
+
+
+@dataclass
+class LatencyHistogram:
+    counts: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_US) + 1))
+    calls: int = 0
+    total_s: float = 0.0
+    max_s: float = 0.0
+
+    def add(self, seconds: float):
+        self.calls += 1
+        self.total_s += seconds
+        if seconds > self.max_s:
+            self.max_s = seconds
+        us = seconds * 1_000_000
+        index = 0
+        for bound in LATENCY_BUCKETS_US:
+            if us <= bound:
+                break
+            index += 1
+        self.counts[index] += 1
+
+    def to_dict(self) -> dict[str, Any]:
+        buckets = {f"<={bound}us": count for bound, count in zip(LATENCY_BUCKETS_US, self.counts) if count}
+        if self.counts[-1]:
+            buckets["overflow"] = self.counts[-1]
+        return {
+            "calls": self.calls,
+            "mean_us": self.total_s / self.calls * 1_000_000 if self.calls else 0.0,
+            "max_us": self.max_s * 1_000_000,
+            "buckets": buckets,
+        }
+
+
+@dataclass
+class EventStats:
+    # emits dispatched; a deferred emit counts once flushed
+    emits: int = 0
+    # deferred emits replaced by a later one with the same coalescing key, never dispatched
+    coalesced: int = 0
+    # callbacks actually invoked, backlog deliveries included
+    handlers_called: int = 0
+    backlog_drops: int = 0
+
+
+class BusProfiler:
+    """
+    Records per-event counters and per-callback latency for one EventBus.
+    Installed by EventBus.enable_profiling(), which shadows the bus internals on the
+    instance, so a bus that was never profiled runs its emit path untouched.
+    """
+
+    def __init__(self, event_bus: "EventBus"):
+        self._bus = event_bus
+        self.started_at: float = time.monotonic()
+        self.events: dict[Events, EventStats] = defaultdict(EventStats)
+        self.callbacks: dict[tuple[Events, str], LatencyHistogram] = defaultdict(LatencyHistogram)
+
+    # ---- hooks installed on the bus ----
+    def dispatch(self, ev: Events, payload: Any, strategy: "Strategy", route: str):
+        from app.core.event_bus.bus import EventBus
+
+        self.events[ev].emits += 1
+        EventBus._dispatch(self._bus, ev, payload, strategy, route)
+
+    def deliver(self, buckets: tuple[tuple["Subscription", ...], ...], ev: Events, payload: Any, strategy: "Strategy"):
+        from app.core.event_bus.bus import Strategy
+
+        stats = self.events[ev]
+        for bucket in buckets:
+            for sub in bucket:
+                cb = sub.resolve() if sub.active else None
+                if cb is None:
+                    continue
+                stats.handlers_called += 1
+                started = time.perf_counter()
+                cb(payload)
+                self.callbacks[(ev, self._callback_name(cb))].add(time.perf_counter() - started)
+                if strategy is Strategy.FirstWin:
+                    return
+
+    def queue_deferred(self, ev: Events, payload: Any, strategy: "Strategy", route: str):
+        from app.core.event_bus.bus import EventBus
+
+        queued = len(self._bus._deferred)
+        EventBus._queue_deferred(self._bus, ev, payload, strategy, route)
+        if len(self._bus._deferred) == queued:
+            self.events[ev].coalesced += 1
+
+    def buffer(self, env: "Envelope"):
+        from app.core.event_bus.bus import EventBus, MAX_BACKLOG
+
+        q = self._bus._backlog.get(env.event, {}).get(env.route)
+        if q is not None and len(q) >= MAX_BACKLOG:
+            self.events[env.event].backlog_drops += 1
+        EventBus._buffer(self._bus, env)
+
+    # ---- reading ----
+    def backlog_size(self, ev: Events) -> int:
+        return sum(len(q) for q in self._bus._backlog.get(ev, {}).values())
+
+    def snapshot(self) -> dict[str, Any]:
+        """Current counters as plain JSON-ready data, one entry per Events member."""
+        events: dict[str, Any] = {}
+        for ev in Events:
+            stats = self.events.get(ev, EventStats())
+            events[ev.name] = {
+                **asdict(stats),
+                "backlog_size": self.backlog_size(ev),
+                "callbacks": {
+                    name: histogram.to_dict()
+                    for (event, name), histogram in self.callbacks.items()
+                    if event is ev
+                },
+            }
+        return {
+            "elapsed_s": time.monotonic() - self.started_at,
+            "events": events,
+        }
+
+    def dump(self, path: str | Path):
+        Path(path).write_text(json.dumps(self.snapshot(), indent=2))
+
+    def reset(self):
+        self.started_at = time.monotonic()
+        self.events.clear()
+        self.callbacks.clear()
+
+    @staticmethod
+    def _callback_name(cb: Callable[[Any], None]) -> str:
+        # bound methods of many instances aggregate under one qualname
+        return getattr(cb, "__qualname__", None) or repr(cb)
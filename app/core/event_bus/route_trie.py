@@ -0,0 +1,107 @@
+from typing import Generic, Iterator, TypeVar
+
+V = TypeVar("V")
+
+SEPARATOR = "/"
+SINGLE_LEVEL = "+"  # matches exactly one segment:  layer/+/actor-42
+MULTI_LEVEL = "#"   # matches the rest, incl. none:  layer/objects/#
+
+
+def is_pattern(route: str) -> bool:
+    """True if the route contains a wildcard segment and has to live in a RouteTrie."""
+    return any(segment in (SINGLE_LEVEL, MULTI_LEVEL) for segment in route.split(SEPARATOR))
+
+
+def pattern_matches(pattern: str, route: str) -> bool:
+    """Check a single emitted route against a subscription pattern."""
+    segments = route.split(SEPARATOR)
+    parts = pattern.split(SEPARATOR)
+    for depth, part in enumerate(parts):
+        if part == MULTI_LEVEL:
+            return True
+        if depth >= len(segments) or (part != SINGLE_LEVEL and part != segments[depth]):
+            return False
+    return len(parts) == len(segments)
+
+
+class _Node:
+    __slots__ = ("children", "pattern")
+
+    def __init__(self):
+        self.children: dict[str, _Node] = {}
+        self.pattern: str | None = None  # set when a stored pattern ends here
+
+
+class RouteTrie(Generic[V]):
+    """
+    Hierarchical route patterns mapped to values, matched segment by segment.
+    Matching a route walks at most one exact and one '+' child per segment and
+    collects '#' values on the way, so the cost follows route depth rather than
+    the number of stored patterns.
+    Behaves like a dict keyed by pattern for get/set/delete/iteration.
+    """
+
+    def __init__(self):
+        self._root = _Node()
+        self._values: dict[str, V] = {}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._values)
+
+    def __contains__(self, pattern: str) -> bool:
+        return pattern in self._values
+
+    def get(self, pattern: str, default: V | None = None) -> V | None:
+        return self._values.get(pattern, default)
+
+    def values(self):
+        return self._values.values()
+
+    def __setitem__(self, pattern: str, value: V):
+        if pattern not in self._values:
+            segments = pattern.split(SEPARATOR)
+            if MULTI_LEVEL in segments[:-1]:
+                raise ValueError(f"'{MULTI_LEVEL}' must be the last segment of a route pattern: {pattern}")
+            node = self._root
+            for segment in segments:
+                node = node.children.setdefault(segment, _Node())
+            node.pattern = pattern
+        self._values[pattern] = value
+
+    def __delitem__(self, pattern: str):
+        del self._values[pattern]
+        path = [self._root]
+        for segment in pattern.split(SEPARATOR):
+            path.append(path[-1].children[segment])
+        path[-1].pattern = None
+        # prune nodes that no longer lead to any pattern
+        for segment, parent, node in zip(reversed(pattern.split(SEPARATOR)), reversed(path[:-1]), reversed(path[1:])):
+            if node.children or node.pattern is not None:
+                break
+            del parent.children[segment]
+
+    def match(self, route: str) -> list[V]:
+        """Values of every stored pattern matching the emitted route."""
+        found: list[V] = []
+        segments = route.split(SEPARATOR)
+        depth_limit = len(segments)
+        stack = [(self._root, 0)]
+        while stack:
+            node, depth = stack.pop()
+            rest = node.children.get(MULTI_LEVEL)
+            if rest is not None:
+                found.append(self._values[rest.pattern])
+            if depth == depth_limit:
+                if node.pattern is not None:
+                    found.append(self._values[node.pattern])
+                continue
+            exact = node.children.get(segments[depth])
+            if exact is not None:
+                stack.append((exact, depth + 1))
+            single = node.children.get(SINGLE_LEVEL)
+            if single is not None:
+                stack.append((single, depth + 1))
+        return found
@@ -0,0 +1,199 @@
+import json
+import struct
+import sys
+import time
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, TYPE_CHECKING
+
+from app.core.event_bus.events import Events
+
+if TYPE_CHECKING:
+    from app.core.event_bus.bus import EventBus, Strategy
+
+TRACE_MAGIC = b"EVTR"
+TRACE_VERSION = 1
+# record with this event id marks the start of a frame; Events values start at 1
+FRAME_MARKER = 0
+
+_HEADER = struct.Struct("<4sHBI")  # magic, version, little-endian flag, record count
+
+
+@dataclass(frozen=True, slots=True)
+class TracedPayload:
+    """Stand-in payload used on replay: what was recorded about the original one."""
+    kind: str
+    object_name: str | None = None
+
+
+class EventTrace:
+    """
+    Fixed-size ring buffer of emitted events. Each record is a row across parallel
+    typed arrays (event id, strategy, route, payload kind, payload subject, monotonic
+    timestamp); strings are interned once, so recording allocates no per-record objects.
+    """
+
+    def __init__(
+            self,
+            capacity: int = 65536,
+            hitch_threshold_s: float | None = None,
+            dump_dir: str | Path = ".",
+            hitch_cooldown_s: float = 10.0,
+            max_hitch_dumps: int = 20,
+    ):
+        self.capacity = capacity
+        self.hitch_threshold_s = hitch_threshold_s
+        self.dump_dir = Path(dump_dir)
+        self.dumps = 0
+        # a run of slow frames gets one dump, and a session at most max_hitch_dumps files
+        self.hitch_cooldown_s = hitch_cooldown_s
+        self.max_hitch_dumps = max_hitch_dumps
+        self.hitch_dumps = 0
+        self._last_hitch_dump: float | None = None
+
+        self._events = array("H", bytes(2 * capacity))
+        self._strategies = array("B", bytes(capacity))
+        self._routes = array("I", bytes(4 * capacity))
+        self._kinds = array("I", bytes(4 * capacity))
+        self._subjects = array("I", bytes(4 * capacity))
+        self._timestamps = array("d", bytes(8 * capacity))
+        self._head = 0  # next slot to write
+        self._count = 0
+
+        # index 0 is reserved for "none"
+        self._strings: list[str] = [""]
+        self._string_ids: dict[str, int] = {"": 0}
+
+    def __len__(self) -> int:
+        return self._count
+
+    def record(self, ev: Events, payload: Any, strategy: "Strategy", route: str):
+        kind = type(payload).__qualname__
+        subject = getattr(payload, "object_name", None)
+        self._write(ev.value, strategy.value, self._intern(route), self._intern(kind), self._intern(subject))
+
+    def mark_frame(self, frame_time_s: float):
+        """
+        Record a frame boundary; dump automatically if the frame exceeded the hitch
+        threshold, unless the last hitch dump is less than hitch_cooldown_s old or the
+        session already wrote max_hitch_dumps of them.
+        """
+        self._write(FRAME_MARKER, 0, 0, 0, 0)
+        if self.hitch_threshold_s is None or frame_time_s <= self.hitch_threshold_s:
+            return
+        now = time.monotonic()
+        if self.hitch_dumps >= self.max_hitch_dumps:
+            return
+        if self._last_hitch_dump is not None and now - self._last_hitch_dump < self.hitch_cooldown_s:
+            return
+        self._last_hitch_dump = now
+        self.hitch_dumps += 1
+        self.dump_to_dir(prefix="hitch")
+
+    def clear(self):
+        self._head = 0
+        self._count = 0
+
+    # ---- dump / load ----
+    def dump(self, path: str | Path):
+        """Write the buffered records, oldest first, in a compact binary file."""
+        start = (self._head - self._count) % self.capacity
+        # oldest first is at most two slices of each column: up to the end, then up to head
+        end = start + self._count
+        strings = json.dumps(self._strings).encode()
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(TRACE_MAGIC, TRACE_VERSION, sys.byteorder == "little", self._count))
+            f.write(struct.pack("<I", len(strings)))
+            f.write(strings)
+            for column in self._columns():
+                if end <= self.capacity:
+                    column[start:end].tofile(f)
+                else:
+                    column[start:].tofile(f)
+                    column[:self._head].tofile(f)
+
+    def dump_to_dir(self, prefix: str = "trace") -> Path:
+        self.dump_dir.mkdir(parents=True, exist_ok=True)
+        self.dumps += 1
+        path = self.dump_dir / f"{prefix}_{int(time.time())}_{self.dumps}.evtrace"
+        self.dump(path)
+        return path
+
+    @classmethod
+    def load(cls, path: str | Path) -> "EventTrace":
+        with open(path, "rb") as f:
+            magic, version, little_endian, count = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != TRACE_MAGIC or version != TRACE_VERSION:
+                raise ValueError(f"{path} is not an event trace (version {TRACE_VERSION})")
+            (strings_len,) = struct.unpack("<I", f.read(4))
+            strings = json.loads(f.read(strings_len))
+
+            trace = cls(capacity=max(count, 1))
+            for column in trace._columns():
+                loaded = array(column.typecode)
+                loaded.fromfile(f, count)
+                if bool(little_endian) != (sys.byteorder == "little"):
+                    loaded.byteswap()
+                column[:count] = loaded
+        trace._head = count % trace.capacity
+        trace._count = count
+        trace._strings = strings
+        trace._string_ids = {s: i for i, s in enumerate(strings)}
+        return trace
+
+    def replay(self, event_bus: "EventBus", realtime: bool = False) -> int:
+        """
+        Emit the recorded events into a bus, oldest first, with TracedPayload stand-ins.
+        With realtime=True the original gaps between records are reproduced.
+        Returns the number of events emitted.
+        """
+        from app.core.event_bus.bus import Strategy
+
+        start = (self._head - self._count) % self.capacity
+        previous_ts = None
+        emitted = 0
+        for i in range(self._count):
+            slot = (start + i) % self.capacity
+            ts = self._timestamps[slot]
+            if realtime and previous_ts is not None and ts > previous_ts:
+                time.sleep(ts - previous_ts)
+            previous_ts = ts
+
+            event_id = self._events[slot]
+            if event_id == FRAME_MARKER:
+                continue
+            subject = self._subjects[slot]
+            event_bus.emit(
+                Events(event_id),
+                TracedPayload(self._strings[self._kinds[slot]], self._strings[subject] if subject else None),
+                Strategy(self._strategies[slot]),
+                self._strings[self._routes[slot]],
+            )
+            emitted += 1
+        return emitted
+
+    # ---- internals ----
+    def _write(self, event_id: int, strategy: int, route: int, kind: int, subject: int):
+        i = self._head
+        self._events[i] = event_id
+        self._strategies[i] = strategy
+        self._routes[i] = route
+        self._kinds[i] = kind
+        self._subjects[i] = subject
+        self._timestamps[i] = time.monotonic()
+        self._head = (i + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def _intern(self, value: str | None) -> int:
+        if not value:
+            return 0
+        index = self._string_ids.get(value)
+        if index is None:
+            index = self._string_ids[value] = len(self._strings)
+            self._strings.append(value)
+        return index
+
+    def _columns(self) -> tuple[array, ...]:
+        return self._events, self._strategies, self._routes, self._kinds, self._subjects, self._timestamps
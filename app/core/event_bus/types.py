@@ -20,6 +20,12 @@ class RegisterObjectPayload:
     z_index: MapLayer = MapLayer.OBJECTS
     icon_path: Path = field(default_factory=Path)
     animations: list[Texture] = field(default_factory=list)
+    # footprint bounding box in tiles, anchored at coordinates (bottom-left)
+    size: CustomVec2i = field(default_factory=lambda: CustomVec2i(1, 1))
+
+@dataclass(frozen=True)
+class RegisterObjectsPayload:
+    objects: tuple[RegisterObjectPayload, ...]
 
 @dataclass(frozen=True)
 class ObjectPayload:
@@ -49,4 +55,21 @@ class MotionUpdatePayload:
 class MousePositionUpdatePayload:
     window_position: CustomVec2i
     world_position: CustomVec2i
-    cell_position: CustomVec2i
\ No newline at end of file
+    cell_position: CustomVec2i
+
+@dataclass(frozen=True)
+class TerrainUpdatePayload:
+    coordinates: CustomVec2i
+    terrain: int  # TerrainTypes
+    previous: int  # TerrainTypes
+
+@dataclass(frozen=True)
+class OpacityUpdatePayload:
+    coordinates: CustomVec2i
+    opaque: bool  # whether opaque holders now cover the tile
+
+@dataclass(frozen=True)
+class FogOfWarUpdatePayload:
+    faction: int
+    revealed: tuple[CustomVec2i, ...]  # tiles the faction started seeing
+    hidden: tuple[CustomVec2i, ...]  # tiles no viewer of the faction sees anymore
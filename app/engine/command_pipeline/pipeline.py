@@ -3,9 +3,9 @@ from dataclasses import dataclass
 from typing import Iterator, Callable, Optional, Iterable
 
 from app.behaviours.types import BehaviourAction
-from app.core.staged_queue import StagedQueue
+from app.engine.command_pipeline.types import PipelineStats
+from app.engine.message_broker.pending_actors import PendingActors
 from app.engine.message_broker.types import Payload
-from app.protocols.collections.actor_collection_protocol import ActorCollectionProtocol
 from app.protocols.objects.actor_protocol import ActorProtocol
 
 
@@ -15,6 +15,8 @@ class ActorAction:
     behaviour_action: BehaviourAction
     attempts_number: int = 0
     resolved: bool = False
+    # 0 for an initiator's own action, n + 1 for reactions to an action of depth n
+    depth: int = 0
 
     def resolve(self) -> bool:
         if self.resolved:
@@ -27,86 +29,109 @@ class ActorAction:
         return self.resolved
 
 class CommandPipeline:
-    MAX_RECURSION_DEPTH = 5
+    """
+    Runs actors' pending actions and everything they set off, in one loop over a work list.
+    The front of the work list is always the next action; an action's reactions (actions
+    handed out by the message broker while it resolved) are pushed in front of what was
+    already there, so each chain of reactions plays out before the next action starts:
+    - an actor that got new pending actions runs them before its own queued action
+    - an action that fails is retried right after its actor's new actions if it got some,
+      otherwise once the work list has run dry
+    - an action is attempted at most MAX_ATTEMPTS times; moves are not among the actions
+      that fail, they are queued and settled after the pass (MovementUtils.commit_moves)
+    - reactions deeper than MAX_REACTION_DEPTH are dropped and counted in stats.dropped
+    """
+    MAX_REACTION_DEPTH = 4
+    MAX_ATTEMPTS = 2
 
     @classmethod
-    def wrap_action(cls, actor: ActorProtocol, behaviour_action: BehaviourAction) -> ActorAction:
-        return ActorAction(actor, behaviour_action)
+    def wrap_action(cls, actor: ActorProtocol, behaviour_action: BehaviourAction, depth: int = 0) -> ActorAction:
+        return ActorAction(actor, behaviour_action, depth=depth)
 
     @classmethod
-    def wrap_actions(cls, actor: ActorProtocol, behaviour_actions: deque[BehaviourAction]) -> Iterator[ActorAction]:
+    def wrap_actions(cls, actor: ActorProtocol, behaviour_actions: deque[BehaviourAction], depth: int = 0) -> Iterator[ActorAction]:
         for action in behaviour_actions:
-            yield cls.wrap_action(actor, action)
-
-    @classmethod
-    def drained_wrapped_actions(cls, initiators: Iterable[ActorProtocol]) -> Iterator[ActorAction]:
-        for initiator in initiators:
-            pending_actions = initiator.pending_actions
-            # setting to new deque() because it is important to keep untouched
-            # the one that passed as a parameter to wrap_actions
-            initiator.pending_actions = deque()
-            yield from cls.wrap_actions(initiator, pending_actions)
+            yield cls.wrap_action(actor, action, depth)
 
     def __init__(self):
-        self.actor_collection: Optional[ActorCollectionProtocol[ActorProtocol]] = None
-        self._queue: StagedQueue[ActorAction] = StagedQueue[ActorAction]()
-
-    def process(self, initiators: Iterable[ActorProtocol]) -> bool:
-        queue = StagedQueue[ActorAction]()
-        queue.middle = self.drained_wrapped_actions(initiators)
-        state_changed = self.process_queue(queue)
-
-        return state_changed
-
-    def __flush_pending(self, state_changed, depth) -> bool:
-        queue = StagedQueue[ActorAction]()
-        queue.middle = self.drained_wrapped_actions(self.actor_collection.get_pending_actors())
-        state_changed = self.process_queue(
-            queue=queue,
-            state_changed=state_changed,
-            depth=depth + 1)
-
-        return state_changed
-
-    def __flush_pending_actor(self, actor: ActorProtocol, state_changed, depth):
-        if actor.pending_actions:
-            queue = StagedQueue[ActorAction]()
-            queue.middle = self.drained_wrapped_actions([actor])
-
-            state_changed = self.process_queue(
-                queue=queue,
-                state_changed=state_changed,
-                depth=depth + 1)
-
-        return state_changed
-
-    def process_queue(self,
-                        queue: StagedQueue[ActorAction] = StagedQueue[ActorAction](),
-                        state_changed: bool = False,
-                        depth: int = 0):
-
-        if depth >= CommandPipeline.MAX_RECURSION_DEPTH:
-            return state_changed
-
-        for action in queue:
-            if action.attempts_number >= 2:
-                continue
+        # filled by the message broker; only actors in it are looked at between actions
+        self.pending_actors: Optional[PendingActors] = None
+        self.stats = PipelineStats()
+        # kept between ticks, empty outside process()
+        self._work: deque[ActorAction] = deque()
+        self._retries: deque[ActorAction] = deque()
+
+    def process(self, initiators: Iterable[ActorProtocol], new_tick: bool = True) -> bool:
+        """
+        Run the initiators' pending actions and their reactions. True if any action resolved.
+        Further passes within the same tick (after moves are committed) pass new_tick=False,
+        so stats.ticks counts game ticks.
+        """
+        work = self._work
+        for initiator in initiators:
+            work.extend(self._take_pending(initiator, 0))
+        if new_tick:
+            self.stats.ticks += 1
+        return self._run()
 
+    def clear(self):
+        self._work.clear()
+        self._retries.clear()
+
+    def _run(self) -> bool:
+        work, retries, stats = self._work, self._retries, self.stats
+        max_attempts = self.MAX_ATTEMPTS
+        state_changed = False
+        while True:
+            if not work:
+                if not retries:
+                    return state_changed
+                # second attempts, once everybody else had a turn
+                work.extend(retries)
+                retries.clear()
+
+            action = work.popleft()
             actor = action.actor
-
-            if not actor.is_active:
+            if action.attempts_number >= max_attempts or not actor.is_active:
                 continue
 
-            state_changed = self.__flush_pending_actor(actor, state_changed, depth)
-            resolved = action.resolve()
-
-            state_changed = resolved or state_changed
-            if not resolved:
-                queue.append_left_first(action) if actor.pending_actions else queue.append_last(action)
-
-            state_changed = self.__flush_pending(state_changed, depth)
-
-        return state_changed
+            if actor.pending_actions:
+                # the actor's own new actions go first, then this one comes back
+                work.appendleft(action)
+                work.extendleft(reversed(self._take_pending(actor, action.depth + 1)))
+                continue
 
-    def clear(self):
-        self._queue = StagedQueue[ActorAction]()
+            stats.attempts += 1
+            if action.depth > stats.max_depth:
+                stats.max_depth = action.depth
+            if action.resolve():
+                stats.resolved += 1
+                state_changed = True
+            elif actor.pending_actions:
+                work.appendleft(action)
+            else:
+                retries.append(action)
+
+            self._schedule_reactions(action.depth + 1)
+
+    def _schedule_reactions(self, depth: int):
+        """Push the actions handed out since the last call in front of the work list, in the order they were sent."""
+        pending_actors = self.pending_actors
+        if not pending_actors:
+            return
+        reactions = []
+        for actor in pending_actors.drain():
+            reactions.extend(self._take_pending(actor, depth))
+        self._work.extendleft(reversed(reactions))
+
+    def _take_pending(self, actor: ActorProtocol, depth: int) -> list[ActorAction]:
+        pending_actions = actor.pending_actions
+        if not pending_actions:
+            return []
+        # setting to new deque() because it is important to keep untouched
+        # the one that is being wrapped
+        actor.pending_actions = deque()
+        if depth > self.MAX_REACTION_DEPTH:
+            self.stats.dropped += len(pending_actions)
+            return []
+        return list(self.wrap_actions(actor, pending_actions, depth))
@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class PipelineStats:
+    """Counters of a CommandPipeline since it was created or its stats were reset."""
+    ticks: int = 0
+    # actions taken off the work list and attempted, retries included
+    attempts: int = 0
+    resolved: int = 0
+    # reactions past MAX_REACTION_DEPTH, never attempted
+    dropped: int = 0
+    # deepest reaction attempted, 0 for actions of the initiators themselves
+    max_depth: int = 0
@@ -12,6 +12,7 @@ from app.engine.command_pipeline.pipeline import CommandPipeline
 from app.engine.game_view.camera import Camera
 from app.engine.game_view.sprite_renderer import SpriteRenderer
 from app.engine.game_view.tmx_animation_parser import load_animated_tilemap_from_parser
+from app.engine.grid.field_of_view import FieldOfView
 from app.engine.input_processor.Timer import Timer
 from app.engine.input_processor.inpuit_events_continuous import InputEventsContinuous
 from app.engine.message_broker.broker import MessageBroker
@@ -87,19 +88,26 @@ class GameView(arcade.View):
             "Orchestrator")
 
         self.command_pipeline = CommandPipeline()
-        self.command_pipeline.actor_collection = self.orchestrator.actors_collection
+        self.command_pipeline.pending_actors = self.message_broker.pending_actors
 
         self.register_actors()
 
         base_behaviour = get_behaviour_registry().get(Behaviours.BEHAVIOUR)
         base_behaviour.register_grid(self.current_level.grid)
         base_behaviour.register_messenger(self.message_broker)
+        self.movement_utils = base_behaviour.get_movement_utils()
 
         # TODO: testing, debugging
         self.puppets = list(self.orchestrator.moveable_actors.raw_items().values())
         self.i = 0
         # EOF TODO
 
+        self.field_of_view = FieldOfView(self.grid)
+        self.sprite_renderer.track_fog(self.config.PLAYER_FACTION, self.grid.width, self.grid.height)
+        for puppet in self.puppets:
+            self.field_of_view.add_viewer(puppet, self.config.PLAYER_FACTION, self.config.VIEW_RADIUS)
+        self.field_of_view.update()
+
         self.ticker = Timer()
         self.state_changed = True
 
@@ -134,6 +142,12 @@ class GameView(arcade.View):
 
 
     def on_update(self, delta_time: float):
+        if self.event_bus.trace is not None:
+            self.event_bus.trace.mark_frame(delta_time)
+
+        # results published by worker threads (asset loading, AI) reach subscribers here
+        self.event_bus.drain_posted(self.config.POSTED_EVENTS_BUDGET)
+
         current_timestamp = self.ticker.current_timestamp()
         render_threshold = int(self.ticker.last_timestamp + self.interval)
         self.input_events_continuous.listen(current_timestamp)
@@ -143,13 +157,26 @@ class GameView(arcade.View):
             last_timestamp = self.ticker.last_timestamp
 
             input_events = self.input_events_continuous.read(prev_timestamp, last_timestamp)
-
-            self.orchestrator.process_tick(delta_time)
-            self.orchestrator.process_continuous_input(input_events)
-
-            self.state_changed = self.command_pipeline.process(
-                self.orchestrator.actors_collection.get_pending_actors()
-            )
+            # grid changes made during this tick are stamped with it
+            self.grid.advance_tick()
+
+            # motion and animation updates are coalesced per object and delivered once per
+            # frame; every other event still reaches its handlers straight away
+            with self.event_bus.deferred():
+                self.orchestrator.process_tick(delta_time)
+                self.orchestrator.process_continuous_input(input_events)
+
+                self.state_changed = self.command_pipeline.process(self.message_broker.pending_actors.drain())
+                # steps asked for during the tick are settled together, then the pushed react
+                for _ in range(self.config.MOVE_ROUNDS):
+                    if not self.movement_utils.pending_moves():
+                        break
+                    if self.movement_utils.commit_moves():
+                        self.state_changed = True
+                    self.command_pipeline.process(self.message_broker.pending_actors.drain(), new_tick=False)
+
+            # only viewers that moved or saw terrain change are recast; fog goes out as deltas
+            self.field_of_view.update()
 
         sprite = self.sprite_renderer.actor_sprite_map.get(self.orchestrator.puppeteer.puppet.name, None)
         if sprite:
@@ -176,6 +203,9 @@ class GameView(arcade.View):
         if key == arcade.key.ESCAPE:
             arcade.exit()
 
+        if key == arcade.key.F9 and self.event_bus.trace is not None:
+            self.event_bus.trace.dump_to_dir()
+
         # playground
         if key == arcade.key.TAB:
             length = len(self.puppets)
@@ -1,8 +1,10 @@
 from collections import defaultdict
 from dataclasses import dataclass, field
 from enum import IntFlag, auto
+from pathlib import Path
 
 import arcade
+from arcade.types import Color
 
 from pyglet.model.codecs.gltf import Texture
 
@@ -10,15 +12,21 @@ from app.core.event_bus.consumer import Consumer
 import app.core.event_bus.events as events
 import app.core.event_bus.types as event_types
 
-from app.core.types import NUM_LAYERS
+from app.core.types import NUM_LAYERS, MapLayer
 from app.core.vectors import CustomVec2f, CustomVec2i
 from app.engine.game_view.animated_sprite import AnimatedSprite
 
 @dataclass
 class SpriteGameData:
     animation: list[Texture] = field(default_factory=list)
-    coordinates: CustomVec2i = field(default_factory=CustomVec2i)
-    moving_buffer: CustomVec2f = field(default_factory=CustomVec2f)
+    coordinates: CustomVec2i = field(default_factory=CustomVec2i.zero)
+    moving_buffer: CustomVec2f = field(default_factory=CustomVec2f.zero)
+    # from the anchor tile to the middle of a footprint, in tiles
+    offset: CustomVec2f = field(default_factory=CustomVec2f.zero)
+
+# fog over tiles never seen, and over tiles seen before but not in view now
+UNEXPLORED_FOG = Color(0, 0, 0, 255)
+EXPLORED_FOG = Color(0, 0, 0, 150)
 
 class Dirty(IntFlag):
     NONE = 0
@@ -37,10 +45,50 @@ class SpriteRenderer(Consumer):
         self._animation_game_data: dict[str, SpriteGameData] = defaultdict(SpriteGameData)
         self._dirty: dict[str, Dirty] = {}
 
+        # fog of war of one faction, sprites on MapLayer.FOG_OF_WAR keyed by tile
+        self._fog_faction: int | None = None
+        self._fog: dict[tuple[int, int], arcade.Sprite] = {}
+
         self.register_handler(events.Events.SpriteAnimationUpdate, self._on_animation_changed)
         self.register_handler(events.Events.MotionUpdate, self._on_move)
         self.register_handler(events.Events.RegisterSprite, self._on_object_registered)
         self.register_handler(events.Events.UnregisterSprite, self._on_object_unregistered)
+        # holders placed on the grid, one by one or as a level-load batch
+        self.register_handler(events.Events.RegisterCoordinateHolder, self._on_object_registered)
+        self.register_handler(events.Events.RegisterCoordinateHolders, self._on_objects_registered)
+        self.register_handler(events.Events.UnregisterCoordinateHolder, self._on_object_unregistered)
+        self.register_handler(events.Events.FogOfWarUpdate, self._on_fog_update)
+
+    def track_fog(self, faction: int, width: int = 0, height: int = 0):
+        """
+        Draw the fog of war seen by one faction. With a size, the whole map starts
+        covered; otherwise only tiles seen once and left are fogged.
+        """
+        for sprite in self._fog.values():
+            sprite.remove_from_sprite_lists()
+        self._fog = {}
+        self._fog_faction = faction
+        for y in range(height):
+            for x in range(width):
+                self._add_fog(x, y, UNEXPLORED_FOG)
+
+    def _add_fog(self, x: int, y: int, color: Color):
+        sprite = arcade.SpriteSolidColor(self.tile_size, self.tile_size, color=color)
+        sprite.center_x = self.get_tile_center(x)
+        sprite.center_y = self.get_tile_center(y)
+        self._sprite_list[MapLayer.FOG_OF_WAR].append(sprite)
+        self._fog[(x, y)] = sprite
+
+    def _on_fog_update(self, payload: event_types.FogOfWarUpdatePayload):
+        if payload.faction != self._fog_faction:
+            return
+        for tile in payload.revealed:
+            sprite = self._fog.pop((tile.x, tile.y), None)
+            if sprite:
+                sprite.remove_from_sprite_lists()
+        for tile in payload.hidden:
+            if (tile.x, tile.y) not in self._fog:
+                self._add_fog(tile.x, tile.y, EXPLORED_FOG)
 
     def _mark(self, name: str, bits: Dirty):
         self._dirty[name] = self._dirty.get(name, Dirty.NONE) | bits
@@ -56,21 +104,62 @@ class SpriteRenderer(Consumer):
         self._dirty.pop(name, None)
 
     def _on_object_registered(self, payload: event_types.RegisterObjectPayload):
-        sprite = (
-            AnimatedSprite(payload.animations, 0.5)
-            if payload.object_type == event_types.ObjectTypes.ANIMATED
-            else arcade.Sprite(payload.icon_path, scale=self.tile_size / 16)
-        )
+        # a holder is announced by activate() and again by the grid, and a re-placed
+        # cursor registers on every move: known objects keep their sprite and only move
+        sprite = self._object_name_sprite_map.get(payload.object_name)
+        if sprite is not None:
+            self._track(payload, sprite)
+            return
+        sprite = self._make_sprite(payload, {})
+        if sprite is None:
+            return
         self._sprite_list[payload.z_index].append(sprite)
+        self._track(payload, sprite)
+
+    def _on_objects_registered(self, payload: event_types.RegisterObjectsPayload):
+        # textures are loaded once per icon and sprites go into each layer in one extend
+        textures: dict[Path, arcade.Texture] = {}
+        by_layer: dict[int, list[arcade.Sprite]] = defaultdict(list)
+        for registration in payload.objects:
+            sprite = self._object_name_sprite_map.get(registration.object_name)
+            if sprite is not None:
+                self._track(registration, sprite)
+                continue
+            sprite = self._make_sprite(registration, textures)
+            if sprite is None:
+                continue
+            by_layer[registration.z_index].append(sprite)
+            self._track(registration, sprite)
+        for z_index, sprites in by_layer.items():
+            self._sprite_list[z_index].extend(sprites)
+
+    def _make_sprite(self, payload: event_types.RegisterObjectPayload, textures: dict[Path, arcade.Texture]) -> arcade.Sprite | None:
+        if payload.object_type == event_types.ObjectTypes.INVISIBLE:
+            return None
+        if payload.object_type == event_types.ObjectTypes.ANIMATED and payload.animations:
+            return AnimatedSprite(payload.animations, 0.5)
+        texture = textures.get(payload.icon_path)
+        if texture is None:
+            texture = textures[payload.icon_path] = arcade.load_texture(payload.icon_path)
+        return arcade.Sprite(texture, scale=self.tile_size / 16)
+
+    def _track(self, payload: event_types.RegisterObjectPayload, sprite: arcade.Sprite):
         self._object_name_sprite_map[payload.object_name] = sprite
-        self._animation_game_data[payload.object_name].coordinates = payload.coordinates
+        data = self._animation_game_data[payload.object_name]
+        data.coordinates = payload.coordinates
+        data.offset = CustomVec2f((payload.size.x - 1) / 2, (payload.size.y - 1) / 2)
         self._mark(payload.object_name, Dirty.POS)
 
     def _on_animation_changed(self, payload: event_types.SpriteAnimationUpdatePayload):
+        # coalesced updates are flushed at the end of the frame, maybe after the unregister
+        if payload.object_name not in self._object_name_sprite_map:
+            return
         self._animation_game_data[payload.object_name].animation = payload.animation
         self._mark(payload.object_name, Dirty.ANIM)
 
     def _on_move(self, payload: event_types.MotionUpdatePayload):
+        if payload.object_name not in self._object_name_sprite_map:
+            return
         data = self._animation_game_data[payload.object_name]
         data.coordinates = payload.coordinates
         data.moving_buffer = payload.moving_buffer
@@ -97,7 +186,7 @@ class SpriteRenderer(Consumer):
             if bits & Dirty.POS:
                 # only write centers when they actually differ (avoids GPU churn)
                 x, y = data.coordinates.x, data.coordinates.y
-                mbx, mby = data.moving_buffer.x, data.moving_buffer.y
+                mbx, mby = data.moving_buffer.x + data.offset.x, data.moving_buffer.y + data.offset.y
                 cx = self.get_tile_center(x) + mbx * self.tile_size
                 cy = self.get_tile_center(y) + mby * self.tile_size
                 if abs(sprite.center_x - cx) > eps:
@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Tuple
 import xml.etree.ElementTree as ET
 
 import arcade
@@ -16,6 +16,8 @@ class TMXAnimationParser:
         self.animations: Dict[int, List[Tuple[int, int]]] = {}  # tile_id -> [(frame_tileid, duration), ...]
         self.tilesets: Dict[str, Dict] = {}  # tileset_name -> tileset_info
         self.map_layers: Dict[str, List[List[int]]] = {}  # layer_name -> 2D grid of tile IDs
+        self.map_chunks: Dict[str, List[Tuple[int, int, List[List[int]]]]] = {}  # infinite maps: layer_name -> [(x, y, rows), ...]
+        self.infinite = False
         self.map_width = 0
         self.map_height = 0
         self.tile_width = 0
@@ -32,6 +34,7 @@ class TMXAnimationParser:
         self.map_height = int(root.get('height'))
         self.tile_width = int(root.get('tilewidth'))
         self.tile_height = int(root.get('tileheight'))
+        self.infinite = root.get('infinite') == '1'
 
         # Parse tilesets
         for tileset in root.findall('tileset'):
@@ -87,18 +90,49 @@ class TMXAnimationParser:
             # Get the data element and parse CSV
             data_elem = layer.find('data')
             if data_elem is not None and data_elem.get('encoding') == 'csv':
-                csv_data = data_elem.text.strip()
+                if self.infinite:
+                    # Infinite maps store only the chunks that were painted, at arbitrary (even negative) offsets
+                    chunks = []
+                    for chunk_elem in data_elem.findall('chunk'):
+                        chunks.append((int(chunk_elem.get('x')), int(chunk_elem.get('y')), self._parse_csv_rows(chunk_elem.text)))
+
+                    self.map_chunks[layer_name] = chunks
+                    Debug.log(f"Parsed infinite layer '{layer_name}': {len(chunks)} chunks", __file__)
+                    continue
+
                 # Parse CSV into 2D grid
-                rows = []
-                for line in csv_data.split('\n'):
-                    if line.strip():
-                        row = [int(x.strip()) for x in line.split(',') if x.strip()]
-                        if row:  # Only add non-empty rows
-                            rows.append(row)
+                rows = self._parse_csv_rows(data_elem.text)
 
                 self.map_layers[layer_name] = rows
                 Debug.log(f"Parsed layer '{layer_name}': {len(rows)} rows, {len(rows[0]) if rows else 0} columns", __file__)
 
+    @staticmethod
+    def _parse_csv_rows(csv_text: str) -> List[List[int]]:
+        rows = []
+        for line in (csv_text or '').strip().split('\n'):
+            if line.strip():
+                row = [int(x.strip()) for x in line.split(',') if x.strip()]
+                if row:  # Only add non-empty rows
+                    rows.append(row)
+        return rows
+
+    def has_layer(self, layer_name: str) -> bool:
+        return layer_name in self.map_layers or layer_name in self.map_chunks
+
+    def iter_layer_tiles(self, layer_name: str) -> Iterator[Tuple[int, int, int]]:
+        """Yield (x, y, tile_id) for every non-empty tile of a layer, in map coordinates,
+        for finite and infinite maps alike"""
+        for y, row in enumerate(self.map_layers.get(layer_name, ())):
+            for x, tile_id in enumerate(row):
+                if tile_id != 0:
+                    yield x, y, tile_id
+
+        for chunk_x, chunk_y, rows in self.map_chunks.get(layer_name, ()):
+            for y, row in enumerate(rows):
+                for x, tile_id in enumerate(row):
+                    if tile_id != 0:
+                        yield chunk_x + x, chunk_y + y, tile_id
+
     def _parse_external_tileset(self, tsx_source: str, firstgid: int):
         """Parse an external TSX tileset file"""
         # Build path to TSX file (relative to TMX file)
@@ -8,7 +8,9 @@ from app.protocols.objects.coordinate_holder_protocol import CoordinateHolderPro
 
 class Cell(Component, CellProtocol):
     def __init__(self, coordinates: CustomVec2i):
-        super().__init__()
+        # cells come and go with their holders: the id comes from the coordinates rather
+        # than Component's generated name, which would stay in the name repository for good
+        self._id = f"cell:{coordinates.x},{coordinates.y}"
         self.coordinates = coordinates
         self.coordinate_holders: CoordinateHolderCollection = CoordinateHolderCollection()
 
@@ -25,9 +27,22 @@ class Cell(Component, CellProtocol):
         return place_to_position_result
 
     def is_able_to_occupy(self, coordinate_holder: CoordinateHolderProtocol, to_place: CustomVec2i) -> PlaceToPositionResult:
-        blocked = self.coordinate_holders.get_blocking_actors(coordinate_holder)
+        # one pass over the occupants, collections are only built for what was hit;
+        # CollisionMatrix.blocks and overlaps inlined as mask ANDs
+        matrix = coordinate_holder.body.collision_matrix
+        category, block_mask, contact_mask = matrix.category, matrix.block_mask, matrix.contact_mask
+        blocked = {}
+        overlapped = {}
+        for name, occupant in self.coordinate_holders.raw_items().items():
+            other = occupant.body.collision_matrix
+            if not (other.category & contact_mask and category & other.contact_mask) or occupant.is_deleted:
+                continue
+            if other.category & block_mask and category & other.block_mask:
+                blocked[name] = occupant
+            elif not blocked:
+                overlapped[name] = occupant
+
         if blocked:
-            return PlaceToPositionResult(placed=False, blocked=blocked)
+            return PlaceToPositionResult(placed=False, blocked=CoordinateHolderCollection(blocked))
 
-        overlapped = self.coordinate_holders.get_overlapping_actors(coordinate_holder)
-        return PlaceToPositionResult(placed=True, overlapped=overlapped)
+        return PlaceToPositionResult(placed=True, overlapped=CoordinateHolderCollection(overlapped))
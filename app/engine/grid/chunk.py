@@ -0,0 +1,34 @@
+from array import array
+
+from app.engine.grid.cell import Cell
+
+CHUNK_SHIFT = 4
+CHUNK_SIZE = 1 << CHUNK_SHIFT  # tiles per chunk side
+CHUNK_MASK = CHUNK_SIZE - 1
+CHUNK_AREA = CHUNK_SIZE * CHUNK_SIZE
+
+
+class Chunk:
+    """
+    Fixed-size square of tiles, allocated by the grid on first use and dropped once
+    nothing lives in it. Per-tile layers are flat arrays indexed by the local index
+    (y & CHUNK_MASK) * CHUNK_SIZE + (x & CHUNK_MASK); cells exist only where holders are.
+    """
+    __slots__ = ("cells", "categories", "blocking", "overlapping", "occupied", "terrain", "opaque", "population")
+
+    def __init__(self):
+        self.cells: dict[int, Cell] = {}
+        # collision channels of the tile's holders and terrain, OR-ed together (see
+        # CollisionMatrix): their categories, their block masks and their contact masks
+        self.categories = array("H", bytes(2 * CHUNK_AREA))
+        self.blocking = array("H", bytes(2 * CHUNK_AREA))
+        self.overlapping = array("H", bytes(2 * CHUNK_AREA))
+        # one bitmask per row, bit x & CHUNK_MASK set while categories is non-zero;
+        # footprints test a whole row of tiles against it at once
+        self.occupied = array("H", bytes(2 * CHUNK_SIZE))
+        # static terrain, one TerrainTypes byte per tile
+        self.terrain = bytearray(CHUNK_AREA)
+        # how many opaque holders (Body.opaque) cover each tile
+        self.opaque = bytearray(CHUNK_AREA)
+        # placed holders plus terrain tiles; the chunk is freed when it drops to zero
+        self.population = 0
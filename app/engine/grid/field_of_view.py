@@ -0,0 +1,248 @@
+from array import array
+from typing import Callable
+
+import app.core.event_bus.types as event_types
+from app.core.event_bus.bus import EventBus, bus
+from app.core.event_bus.events import Events
+from app.core.vectors import CustomVec2i
+from app.engine.grid.chunk import CHUNK_AREA, CHUNK_MASK, CHUNK_SHIFT
+from app.engine.grid.types import TerrainOpaque, TerrainTypes
+from app.protocols.engine.grid.grid_protocol import GridProtocol
+from app.protocols.objects.coordinate_holder_protocol import CoordinateHolderProtocol
+
+# one bit per faction in the visibility masks
+MAX_FACTIONS = 16
+
+# (xx, xy, yx, yy) transforms mapping octant-local (column, row) onto grid offsets
+_OCTANTS = (
+    (1, 0, 0, 1), (0, 1, 1, 0), (0, -1, 1, 0), (-1, 0, 0, 1),
+    (-1, 0, 0, -1), (0, -1, -1, 0), (0, 1, -1, 0), (1, 0, 0, -1),
+)
+
+
+def shadowcast(ox: int, oy: int, radius: int, opaque: Callable[[int, int], bool]) -> set[tuple[int, int]]:
+    """
+    Tiles visible from (ox, oy) within a circular radius, by recursive shadowcasting.
+    Opaque tiles are visible themselves but hide what is behind them.
+    """
+    visible = {(ox, oy)}
+    radius_sq = radius * radius + radius  # (radius + 0.5)^2 rounded, gives rounder edges
+
+    def cast(row: int, start: float, end: float, xx: int, xy: int, yx: int, yy: int):
+        if start < end:
+            return
+        new_start = 0.0
+        for distance in range(row, radius + 1):
+            dx, dy = -distance - 1, -distance
+            blocked = False
+            while dx <= 0:
+                dx += 1
+                left_slope = (dx - 0.5) / (dy + 0.5)
+                right_slope = (dx + 0.5) / (dy - 0.5)
+                if start < right_slope:
+                    continue
+                if end > left_slope:
+                    break
+                x, y = ox + dx * xx + dy * xy, oy + dx * yx + dy * yy
+                if dx * dx + dy * dy <= radius_sq:
+                    visible.add((x, y))
+                if blocked:
+                    if opaque(x, y):
+                        new_start = right_slope
+                        continue
+                    blocked = False
+                    start = new_start
+                elif distance < radius and opaque(x, y):
+                    # the rest of this row is in shadow: scan the lit part beyond it first
+                    blocked = True
+                    cast(distance + 1, start, left_slope, xx, xy, yx, yy)
+                    new_start = right_slope
+            if blocked:
+                break
+
+    for octant in _OCTANTS:
+        cast(1, 1.0, 0.0, *octant)
+    return visible
+
+
+class Viewer:
+    __slots__ = ("name", "faction", "radius", "origin", "visible")
+
+    def __init__(self, name: str, faction: int, radius: int, origin: tuple[int, int]):
+        self.name = name
+        self.faction = faction
+        self.radius = radius
+        self.origin = origin
+        self.visible: set[tuple[int, int]] = set()
+
+
+class FieldOfView:
+    """
+    Field of view of every registered viewer over the grid's opacity (terrain and opaque
+    holders), and what each faction sees as a whole.
+
+    A viewer's visible set is cached and only recomputed on update() when the viewer
+    moved (Events.MoveCoordinateHolder) or a tile within its radius changed opacity
+    (Events.TerrainUpdate, Events.OpacityUpdate). A viewer whose actor is deactivated,
+    deleted or taken off the grid is removed, along with what it saw. The faction union is kept incrementally from the difference
+    between old and new sets: a per-tile count of the faction's viewers seeing it, and
+    per-chunk bitmask arrays with bit `faction` set while that count is positive.
+    Edges of the union are collected per faction and published as one
+    Events.FogOfWarUpdate per faction and update(), so renderers only touch what changed.
+    """
+
+    def __init__(self, grid: GridProtocol, event_bus: EventBus = bus):
+        self.grid = grid
+        self.recomputes = 0
+        self._viewers: dict[str, Viewer] = {}
+        self._dirty: set[str] = set()
+        # per chunk key, one faction bitmask per tile; kept once allocated, like explored ground
+        self._masks: dict[tuple[int, int], array] = {}
+        # per faction, how many of its viewers see each tile
+        self._counts: dict[int, dict[tuple[int, int], int]] = {}
+        # per faction, union edges not published yet
+        self._revealed: dict[int, set[tuple[int, int]]] = {}
+        self._hidden: dict[int, set[tuple[int, int]]] = {}
+        self._event_bus = event_bus
+        self._subscriptions = event_bus.subscribe_many([
+            (Events.MoveCoordinateHolder, self._on_move),
+            (Events.TerrainUpdate, self._on_terrain_update),
+            (Events.OpacityUpdate, self._on_opacity_update),
+            (Events.UnregisterActor, self._on_unregister),
+            (Events.UnregisterCoordinateHolder, self._on_unregister),
+        ])
+
+    def add_viewer(self, coordinate_holder: CoordinateHolderProtocol, faction: int, radius: int):
+        if not 0 <= faction < MAX_FACTIONS:
+            raise ValueError(f"Faction must be in [0, {MAX_FACTIONS}), got {faction}")
+        self.remove_viewer(coordinate_holder.name)
+        coordinates = coordinate_holder.coordinates
+        self._viewers[coordinate_holder.name] = Viewer(coordinate_holder.name, faction, radius, (coordinates.x, coordinates.y))
+        self._dirty.add(coordinate_holder.name)
+
+    def remove_viewer(self, name: str) -> bool:
+        viewer = self._viewers.pop(name, None)
+        if viewer is None:
+            return False
+        self._dirty.discard(name)
+        self._apply(viewer.faction, viewer.visible, -1)
+        return True
+
+    def update(self) -> int:
+        """Recompute the viewers marked dirty and publish fog deltas. Returns how many were recomputed."""
+        recomputed = len(self._dirty)
+        if recomputed:
+            opaque = self.grid.opacity_probe()
+            for name in self._dirty:
+                viewer = self._viewers[name]
+                visible = shadowcast(viewer.origin[0], viewer.origin[1], viewer.radius, opaque)
+                if self._crosses_edge(viewer):
+                    # the edge reads as a wall and shows up in the set
+                    width, height = self.grid.width, self.grid.height
+                    visible = {(x, y) for x, y in visible if 0 <= x < width and 0 <= y < height}
+                self._apply(viewer.faction, viewer.visible - visible, -1)
+                self._apply(viewer.faction, visible - viewer.visible, 1)
+                viewer.visible = visible
+            self._dirty.clear()
+            self.recomputes += recomputed
+        self._publish()
+        return recomputed
+
+    def is_visible(self, faction: int, coordinates: CustomVec2i) -> bool:
+        return bool(self.visibility_mask(coordinates) & (1 << faction))
+
+    def visibility_mask(self, coordinates: CustomVec2i) -> int:
+        """Bit f is set when a viewer of faction f sees the tile."""
+        mask = self._masks.get((coordinates.x >> CHUNK_SHIFT, coordinates.y >> CHUNK_SHIFT))
+        if mask is None:
+            return 0
+        return mask[((coordinates.y & CHUNK_MASK) << CHUNK_SHIFT) | (coordinates.x & CHUNK_MASK)]
+
+    def visible_tiles(self, name: str) -> frozenset[tuple[int, int]]:
+        viewer = self._viewers.get(name)
+        return frozenset(viewer.visible) if viewer else frozenset()
+
+    def close(self):
+        self._event_bus.unsubscribe_many(self._subscriptions)
+        self._viewers.clear()
+        self._dirty.clear()
+
+    # ---- internals ----
+    def _apply(self, faction: int, tiles: set[tuple[int, int]], delta: int):
+        if not tiles:
+            return
+        bit = 1 << faction
+        counts = self._counts.setdefault(faction, {})
+        revealed = self._revealed.setdefault(faction, set())
+        hidden = self._hidden.setdefault(faction, set())
+        masks = self._masks
+        for tile in tiles:
+            count = counts.get(tile, 0) + delta
+            if count:
+                counts[tile] = count
+            else:
+                del counts[tile]
+            if count > 1 or (count == 1 and delta < 0):
+                continue  # other viewers of the faction still see it
+
+            x, y = tile
+            key = (x >> CHUNK_SHIFT, y >> CHUNK_SHIFT)
+            mask = masks.get(key)
+            if mask is None:
+                mask = masks[key] = array("H", bytes(2 * CHUNK_AREA))
+            index = ((y & CHUNK_MASK) << CHUNK_SHIFT) | (x & CHUNK_MASK)
+            if count:
+                mask[index] |= bit
+                if tile in hidden:
+                    hidden.discard(tile)
+                else:
+                    revealed.add(tile)
+            else:
+                mask[index] &= ~bit
+                if tile in revealed:
+                    revealed.discard(tile)
+                else:
+                    hidden.add(tile)
+
+    def _crosses_edge(self, viewer: Viewer) -> bool:
+        if getattr(self.grid, "infinite", False):
+            return False
+        (x, y), radius = viewer.origin, viewer.radius
+        return x - radius < 0 or y - radius < 0 or x + radius >= self.grid.width or y + radius >= self.grid.height
+
+    def _publish(self):
+        for faction, revealed in self._revealed.items():
+            hidden = self._hidden[faction]
+            if not (revealed or hidden):
+                continue
+            self._event_bus.emit(Events.FogOfWarUpdate, event_types.FogOfWarUpdatePayload(
+                faction=faction,
+                revealed=tuple(CustomVec2i(x, y) for x, y in revealed),
+                hidden=tuple(CustomVec2i(x, y) for x, y in hidden),
+            ))
+            revealed.clear()
+            hidden.clear()
+
+    def _on_move(self, payload: event_types.ObjectPositionPayload):
+        viewer = self._viewers.get(payload.object_name)
+        if viewer is not None:
+            viewer.origin = (payload.coordinates.x, payload.coordinates.y)
+            self._dirty.add(viewer.name)
+
+    def _on_unregister(self, payload: event_types.ObjectPayload):
+        self.remove_viewer(payload.object_name)
+
+    def _on_terrain_update(self, payload: event_types.TerrainUpdatePayload):
+        if TerrainOpaque[TerrainTypes(payload.terrain)] != TerrainOpaque[TerrainTypes(payload.previous)]:
+            self._mark_around(payload.coordinates)
+
+    def _on_opacity_update(self, payload: event_types.OpacityUpdatePayload):
+        self._mark_around(payload.coordinates)
+
+    def _mark_around(self, coordinates: CustomVec2i):
+        """Mark dirty the viewers whose radius covers the tile."""
+        x, y = coordinates.x, coordinates.y
+        for viewer in self._viewers.values():
+            ox, oy = viewer.origin
+            if abs(x - ox) <= viewer.radius and abs(y - oy) <= viewer.radius:
+                self._dirty.add(viewer.name)
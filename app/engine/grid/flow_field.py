@@ -0,0 +1,251 @@
+import heapq
+from array import array
+from collections import OrderedDict, deque
+from typing import Iterable
+
+import app.core.event_bus.types as event_types
+from app.components.physics.body import CollisionResponse
+from app.core.event_bus.bus import EventBus, bus
+from app.core.event_bus.events import Events
+from app.core.vectors import CustomVec2i
+from app.engine.grid.types import TerrainCollision, TerrainTypes
+from app.protocols.engine.grid.grid_protocol import GridProtocol
+from app.protocols.objects.coordinate_holder_protocol import CoordinateHolderProtocol
+
+UNREACHABLE = 0x7FFFFFFF
+
+# direction codes stored in FlowField.directions; 0 means stay (goal, blocked or unreachable)
+DIRECTIONS: tuple[CustomVec2i, ...] = (
+    CustomVec2i(0, 0),
+    CustomVec2i(1, 0), CustomVec2i(-1, 0), CustomVec2i(0, 1), CustomVec2i(0, -1),
+    CustomVec2i(1, 1), CustomVec2i(1, -1), CustomVec2i(-1, 1), CustomVec2i(-1, -1),
+)
+
+
+class FlowField:
+    """
+    Distances to one goal over a rectangular window of the grid, plus the direction
+    to step from every tile. Layers are flat arrays indexed (y - bottom) * width + (x - left):
+    - passable: 1 where terrain lets a solid mover through
+    - integration: BFS distance to the goal in orthogonal steps, UNREACHABLE otherwise
+    - directions: index into DIRECTIONS of the neighbour closest to the goal; diagonal
+      steps are only taken when both orthogonal tiles are open
+    """
+
+    def __init__(self, goal: CustomVec2i, left: int, bottom: int, width: int, height: int, passable: bytearray):
+        self.goal = goal
+        self.left = left
+        self.bottom = bottom
+        self.width = width
+        self.height = height
+        self.passable = passable
+        self.integration = array("i", [UNREACHABLE]) * (width * height)
+        self.directions = bytearray(width * height)
+        self._goal_index = self._index(goal.x, goal.y)
+        self._build()
+
+    def direction_at(self, x: int, y: int) -> CustomVec2i:
+        """Next step from a tile towards the goal, zero when there is none."""
+        index = self._index(x, y)
+        return DIRECTIONS[self.directions[index]] if index is not None else DIRECTIONS[0]
+
+    def distance_at(self, x: int, y: int) -> int | None:
+        index = self._index(x, y)
+        if index is None or self.integration[index] == UNREACHABLE:
+            return None
+        return self.integration[index]
+
+    def update_tile(self, x: int, y: int, passable: bool) -> int:
+        """
+        Apply one tile turning passable or blocked and repair the field around it.
+        Only tiles whose distance depended on the change are recomputed.
+        Returns the number of tiles whose distance changed.
+        """
+        index = self._index(x, y)
+        if index is None or self.passable[index] == passable:
+            return 0
+        self.passable[index] = passable
+        if index == self._goal_index:
+            return 0
+
+        integration = self.integration
+        if passable:
+            changed = set()
+            best = min((integration[n] for n in self._neighbours(index)), default=UNREACHABLE)
+            if best != UNREACHABLE:
+                integration[index] = best + 1
+                changed = self._propagate([(best + 1, index)])
+                changed.add(index)
+        else:
+            # tiles that reached the goal only through this one: walking outwards level by
+            # level, a tile is lost once every neighbour one step closer to the goal is lost
+            changed = {index}
+            queue = deque([index])
+            while queue:
+                current = queue.popleft()
+                further = integration[current] + 1
+                for n in self._neighbours(current):
+                    if n in changed or integration[n] != further:
+                        continue
+                    if all(m in changed for m in self._neighbours(n) if integration[m] == further - 1):
+                        changed.add(n)
+                        queue.append(n)
+            for i in changed:
+                integration[i] = UNREACHABLE
+            # refill them from the untouched border
+            seeds = [
+                (integration[n], n)
+                for i in changed for n in self._neighbours(i)
+                if n not in changed and integration[n] != UNREACHABLE
+            ]
+            heapq.heapify(seeds)
+            self._propagate(seeds)
+
+        # a direction looks at all 8 neighbours, and the tile's own passability decides
+        # whether diagonal steps around it are allowed
+        self._direct({n for i in changed | {index} for n in self._surrounding(i)})
+        return len(changed)
+
+    # ---- internals ----
+    def _index(self, x: int, y: int) -> int | None:
+        x -= self.left
+        y -= self.bottom
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return y * self.width + x
+        return None
+
+    def _neighbours(self, index: int) -> Iterable[int]:
+        width = self.width
+        x = index % width
+        if x + 1 < width:
+            yield index + 1
+        if x > 0:
+            yield index - 1
+        if index + width < len(self.passable):
+            yield index + width
+        if index >= width:
+            yield index - width
+
+    def _surrounding(self, index: int) -> Iterable[int]:
+        """The tile itself and its 8 neighbours inside the window."""
+        width = self.width
+        x, y = index % width, index // width
+        for ny in range(max(y - 1, 0), min(y + 2, self.height)):
+            for nx in range(max(x - 1, 0), min(x + 2, width)):
+                yield ny * width + nx
+
+    def _build(self):
+        goal = self._goal_index
+        if goal is None:
+            return
+        integration, passable = self.integration, self.passable
+        integration[goal] = 0
+        queue = deque([goal])
+        while queue:
+            current = queue.popleft()
+            distance = integration[current] + 1
+            for n in self._neighbours(current):
+                if passable[n] and integration[n] == UNREACHABLE:
+                    integration[n] = distance
+                    queue.append(n)
+        self._direct(range(len(integration)))
+
+    def _propagate(self, heap: list[tuple[int, int]]) -> set[int]:
+        integration, passable = self.integration, self.passable
+        reached = set()
+        while heap:
+            distance, current = heapq.heappop(heap)
+            if distance > integration[current]:
+                continue
+            for n in self._neighbours(current):
+                if passable[n] and distance + 1 < integration[n]:
+                    integration[n] = distance + 1
+                    reached.add(n)
+                    heapq.heappush(heap, (distance + 1, n))
+        return reached
+
+    def _direct(self, indices: Iterable[int]):
+        integration, passable, directions = self.integration, self.passable, self.directions
+        width, size = self.width, len(integration)
+        for index in indices:
+            here = integration[index]
+            if here == UNREACHABLE or here == 0:
+                directions[index] = 0
+                continue
+            x = index % width
+            right = index + 1 if x + 1 < width else -1
+            left = index - 1 if x > 0 else -1
+            up = index + width if index + width < size else -1
+            down = index - width if index >= width else -1
+
+            best, code = here, 0
+            for step, n in ((1, right), (2, left), (3, up), (4, down)):
+                if n >= 0 and integration[n] < best:
+                    best, code = integration[n], step
+            for step, a, b in ((5, right, up), (6, right, down), (7, left, up), (8, left, down)):
+                if a >= 0 and b >= 0 and passable[a] and passable[b]:
+                    n = b + (a - index)
+                    if integration[n] < best:
+                        best, code = integration[n], step
+            directions[index] = code
+
+
+class FlowFields:
+    """
+    Flow fields cached per goal tile, for crowds heading to the same place. Fields follow
+    terrain only; units still resolve collisions among themselves when they step.
+    Cached fields are repaired in place on Events.TerrainUpdate rather than rebuilt.
+    """
+
+    def __init__(self, grid: GridProtocol, radius: int | None = None, max_fields: int = 16, event_bus: EventBus = bus):
+        self.grid = grid
+        # window around the goal; None covers the whole grid, infinite grids need a window
+        if radius is None and getattr(grid, "infinite", False):
+            radius = 64
+        self.radius = radius
+        self.max_fields = max_fields
+        self.builds = 0
+        self._fields: OrderedDict[tuple[int, int], FlowField] = OrderedDict()
+        self._event_bus = event_bus
+        self._subscription = event_bus.subscribe(Events.TerrainUpdate, self._on_terrain_update)
+
+    def get(self, goal: CustomVec2i) -> FlowField:
+        key = (goal.x, goal.y)
+        field = self._fields.get(key)
+        if field is not None:
+            self._fields.move_to_end(key)
+            return field
+
+        field = self._build(goal)
+        self._fields[key] = field
+        if len(self._fields) > self.max_fields:
+            self._fields.popitem(last=False)
+        return field
+
+    def next_step(self, coordinate_holder: CoordinateHolderProtocol, goal: CustomVec2i) -> CustomVec2i:
+        """O(1) once the field for the goal exists."""
+        coordinates = coordinate_holder.coordinates
+        return self.get(goal).direction_at(coordinates.x, coordinates.y)
+
+    def clear(self):
+        self._fields.clear()
+
+    def close(self):
+        self._event_bus.unsubscribe_handle(self._subscription)
+        self._fields.clear()
+
+    def _build(self, goal: CustomVec2i) -> FlowField:
+        self.builds += 1
+        if self.radius is None:
+            left, bottom, width, height = 0, 0, self.grid.width, self.grid.height
+        else:
+            left, bottom = goal.x - self.radius, goal.y - self.radius
+            width = height = 2 * self.radius + 1
+
+        passable = self.grid.passable_window(left, bottom, width, height)
+        return FlowField(goal, left, bottom, width, height, passable)
+
+    def _on_terrain_update(self, payload: event_types.TerrainUpdatePayload):
+        passable = TerrainCollision[TerrainTypes(payload.terrain)].response != CollisionResponse.BLOCK
+        for field in self._fields.values():
+            field.update_tile(payload.coordinates.x, payload.coordinates.y, passable)
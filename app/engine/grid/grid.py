@@ -1,67 +1,252 @@
+from collections import OrderedDict, deque
+from typing import Callable, Iterable, Iterator, Sequence
+
 import app.core.event_bus.types as event_types
 from app.components.component import Component
+from app.components.physics.body import CollisionMatrix, CollisionResponse
 from app.core.event_bus.bus import bus
 from app.core.event_bus.events import Events
+from app.core.types import MapLayer
 from app.core.vectors import CustomVec2i
+from app.collections.coordinate_holder_collection import CoordinateHolderCollection
+from app.components.physics.footprint import Footprint, FootprintRows
 from app.engine.grid.cell import Cell
-from app.engine.grid.types import PlaceToPositionResult
+from app.engine.grid.chunk import Chunk, CHUNK_AREA, CHUNK_SHIFT, CHUNK_MASK, CHUNK_SIZE
+from app.engine.grid.types import PlaceToPositionResult, PLACED, NOT_PLACED, TerrainTypes, TerrainCollision, TerrainOpaque, \
+    GridChange, GridChangeKinds
 from app.protocols.engine.grid.grid_protocol import GridProtocol
 from app.protocols.objects.coordinate_holder_protocol import CoordinateHolderProtocol
 
+# indexed by TerrainTypes value
+_TERRAIN_COLLISION = tuple(TerrainCollision[terrain] for terrain in TerrainTypes)
+# terrain that stops a mover declared with a plain CollisionResponse.BLOCK
+_TERRAIN_BLOCKS = tuple(matrix.blocks(CollisionMatrix(CollisionResponse.BLOCK)) for matrix in _TERRAIN_COLLISION)
+_TERRAIN_OPAQUE = tuple(TerrainOpaque[terrain] for terrain in TerrainTypes)
+# bytes.translate table from terrain bytes to 1 where a plain BLOCK mover can pass
+_TERRAIN_PASSABLE = bytes(not blocks for blocks in _TERRAIN_BLOCKS).ljust(256, b"\x00")
+
+# per region, how many ticks with changes keep their own dirty-tile bitmap
+REGION_LOG_LENGTH = 32
+# the dirty bitmap of a region is coarse: one bit per DIRTY_BLOCK x DIRTY_BLOCK tiles,
+# bit (by * DIRTY_BLOCKS + bx) for block column bx and row by inside the region
+DIRTY_BLOCK = 4
+DIRTY_BLOCKS = CHUNK_SIZE // DIRTY_BLOCK
+_ALL_BLOCKS = (1 << (DIRTY_BLOCKS * DIRTY_BLOCKS)) - 1
+_DIRTY_BITS = tuple(
+    1 << ((index >> CHUNK_SHIFT) // DIRTY_BLOCK * DIRTY_BLOCKS + (index & CHUNK_MASK) // DIRTY_BLOCK)
+    for index in range(CHUNK_AREA)
+)
+# journal deltas: 1 enter, -1 leave, 0 terrain
+_CHANGE_KINDS = {1: GridChangeKinds.ENTER, -1: GridChangeKinds.LEAVE, 0: GridChangeKinds.TERRAIN}
+
+
+def _registration(coordinate_holder: CoordinateHolderProtocol) -> event_types.RegisterObjectPayload:
+    shape = coordinate_holder.shape
+    if shape is None:
+        # drawn by the map itself
+        return event_types.RegisterObjectPayload(
+            object_name=coordinate_holder.name,
+            object_type=event_types.ObjectTypes.INVISIBLE,
+            coordinates=coordinate_holder.coordinates,
+        )
+    footprint = coordinate_holder.body.footprint
+    return event_types.RegisterObjectPayload(
+        object_name=coordinate_holder.name,
+        object_type=event_types.ObjectTypes.ANIMATED if shape.animations else event_types.ObjectTypes.STATIC,
+        coordinates=coordinate_holder.coordinates,
+        z_index=MapLayer.OBJECTS if footprint is None else MapLayer.BIG_OBJECTS,
+        icon_path=shape.icon_path,
+        animations=shape.get_current_animation() or [],
+        size=CustomVec2i(1, 1) if footprint is None else CustomVec2i(footprint.width, footprint.height),
+    )
+
 
 class Grid(Component, GridProtocol):
-    def __init__(self, width = 0, height = 0):
+    """
+    Sparse grid of fixed-size chunks keyed by (x >> CHUNK_SHIFT, y >> CHUNK_SHIFT).
+    Chunks are allocated when something is placed in them and freed when they empty,
+    so memory follows the occupied area, not width * height. With infinite=True the
+    grid has no bounds (TMX infinite maps, negative coordinates included).
+    """
+
+    def __init__(self, width = 0, height = 0, infinite: bool = False, journal_capacity: int = 4096):
         super().__init__()
         self.width = width
         self.height = height
+        self.infinite = infinite
         self.event_bus = bus
-        self.cells = [[Cell(CustomVec2i(x=x, y=y)) for x in range(width)] for y in range(height)]
+        self._chunks: dict[tuple[int, int], Chunk] = {}
+        # per chunk key; bumped whenever blocking in that chunk changes, outlives freed chunks
+        self._region_versions: dict[tuple[int, int], int] = {}
+
+        # change tracking, stamped with the tick advanced by the game loop:
+        # - dirty bitmaps (see DIRTY_BLOCK) per region (chunk key) for the current tick,
+        #   moved into the two structures below when the tick is sealed
+        # - every region with the last sealed tick it changed in, oldest first
+        # - per region, (tick, bitmap) for its last changed ticks, ordered like the above
+        # - the journal of individual changes, the most recent journal_capacity of them
+        # logs and journal only go back to the oldest tick a reader still has to read
+        self.tick = 0
+        self._dirty_now: dict[tuple[int, int], int] = {}
+        self._changed_regions: OrderedDict[tuple[int, int], int] = OrderedDict()
+        self._region_logs: OrderedDict[tuple[int, int], deque[tuple[int, int]]] = OrderedDict()
+        self._journal: deque[tuple] | None = deque(maxlen=journal_capacity) if journal_capacity else None
+        # per reader, the first tick it has not read yet
+        self._readers: dict[str, int] = {}
+        # ticks before this one were pruned from the logs and the journal
+        self._history_start = 0
 
     def get_cell(self, coordinates: CustomVec2i) -> Cell | None:
-        if 0 <= coordinates.x < self.width and 0 <= coordinates.y < self.height:
-            return self.cells[coordinates.y][coordinates.x]
-        return None
+        if not self._in_bounds(coordinates):
+            return None
+        chunk = self._chunks.get((coordinates.x >> CHUNK_SHIFT, coordinates.y >> CHUNK_SHIFT))
+        cell = chunk.cells.get(self._local(coordinates)) if chunk else None
+        # an empty tile has no stored cell; hand out an empty one that is not kept
+        return cell if cell is not None else Cell(coordinates)
 
     def place(self, coordinate_holder: CoordinateHolderProtocol, to_place: CustomVec2i) -> PlaceToPositionResult:
         result = self._place(coordinate_holder, to_place)
         if result.placed:
-            self.event_bus.emit(
-                Events.RegisterCoordinateHolder,
-                event_types.RegisterObjectPayload(
-                    object_name=coordinate_holder.name,
-                    object_type=event_types.ObjectTypes.ANIMATED if coordinate_holder.shape.animations else event_types.ObjectTypes.STATIC,
-                    coordinates=coordinate_holder.coordinates,
-                    icon_path=coordinate_holder.shape.icon_path,
-                    animations=coordinate_holder.shape.get_textures(),
-                )
-            )
+            self.event_bus.emit(Events.RegisterCoordinateHolder, _registration(coordinate_holder))
 
         return result
 
+    def place_many(self, coordinate_holders: Iterable[CoordinateHolderProtocol]) -> list[CoordinateHolderProtocol]:
+        """
+        Place holders at their own coordinates in one pass and announce all of them with a
+        single Events.RegisterCoordinateHolders, for level load. Returns the holders that
+        could not be placed.
+        """
+        registrations = []
+        rejected = []
+        for coordinate_holder in coordinate_holders:
+            if self._place(coordinate_holder, coordinate_holder.coordinates).placed:
+                registrations.append(_registration(coordinate_holder))
+            else:
+                rejected.append(coordinate_holder)
+        if registrations:
+            self.event_bus.emit(Events.RegisterCoordinateHolders, event_types.RegisterObjectsPayload(tuple(registrations)))
+        return rejected
+
     def _place(self, coordinate_holder: CoordinateHolderProtocol, to_place: CustomVec2i) -> PlaceToPositionResult:
-        cell = self.get_cell(to_place)
-        return cell.place(coordinate_holder, to_place) if cell else PlaceToPositionResult(placed=False)
+        footprint = coordinate_holder.body.footprint
+        if footprint is not None:
+            if not self._footprint_in_bounds(footprint, to_place.x, to_place.y):
+                return NOT_PLACED
+            result = self._check_rows(coordinate_holder, to_place.x, to_place.y, footprint.stamp())
+            if result.placed:
+                coordinate_holder.coordinates = to_place
+                self._stamp(coordinate_holder, to_place.x, to_place.y, footprint.stamp(), 1)
+            return result
+        if not self._in_bounds(to_place):
+            return NOT_PLACED
+        key = (to_place.x >> CHUNK_SHIFT, to_place.y >> CHUNK_SHIFT)
+        index = self._local(to_place)
+        chunk = self._chunks.get(key)
+        if chunk is None:
+            chunk = self._chunks[key] = Chunk()
+        elif not self._is_clear(coordinate_holder, chunk, index):
+            if self._terrain_blocks(coordinate_holder, chunk, index):
+                return NOT_PLACED
+            cell = chunk.cells.get(index)
+            if cell is not None:
+                result = cell.place(coordinate_holder, to_place)
+                if result.placed:
+                    self._count(coordinate_holder, key, chunk, index, 1)
+                return result
+
+        self._insert(coordinate_holder, to_place, key, chunk, index)
+        return PLACED
+
+    def _insert(self, coordinate_holder: CoordinateHolderProtocol, to_place: CustomVec2i, key: tuple[int, int], chunk: Chunk, index: int):
+        """Put a single-cell holder in a tile without asking anybody there."""
+        cell = chunk.cells.get(index)
+        if cell is None:
+            cell = chunk.cells[index] = Cell(to_place)
+        coordinate_holder.coordinates = to_place
+        cell.coordinate_holders.add(coordinate_holder)
+        self._count(coordinate_holder, key, chunk, index, 1)
 
     def remove(self, coordinate_holder: CoordinateHolderProtocol, from_place: CustomVec2i) -> bool:
-        cell = self.get_cell(from_place)
-        if cell:
+        if self._in_bounds(from_place):
             self.event_bus.emit(
                 Events.UnregisterCoordinateHolder,
                 event_types.ObjectPayload(
                     object_name=coordinate_holder.name,
                 )
             )
-            return cell.remove(coordinate_holder)
+            return self._remove(coordinate_holder, from_place)
         else:
             return False
 
+    def _remove(self, coordinate_holder: CoordinateHolderProtocol, from_place: CustomVec2i) -> bool:
+        if coordinate_holder.body.footprint is not None:
+            return self._stamp(coordinate_holder, from_place.x, from_place.y, coordinate_holder.body.footprint.stamp(), -1) > 0
+        key = (from_place.x >> CHUNK_SHIFT, from_place.y >> CHUNK_SHIFT)
+        chunk = self._chunks.get(key)
+        if chunk is None:
+            return False
+        index = self._local(from_place)
+        cell = chunk.cells.get(index)
+        if cell is None or not cell.remove(coordinate_holder):
+            return False
+        if not cell.coordinate_holders.raw_items():
+            del chunk.cells[index]
+        self._count(coordinate_holder, key, chunk, index, -1)
+        self._release(key, chunk)
+        return True
+
     def is_may_be_occupied(self, coordinate_holder: CoordinateHolderProtocol, to_place: CustomVec2i) -> PlaceToPositionResult:
-        cell = self.get_cell(to_place)
-        return cell.is_able_to_occupy(coordinate_holder, to_place) if cell else PlaceToPositionResult(placed=False)
+        if coordinate_holder.body.footprint is not None:
+            return self._check_footprint(coordinate_holder, to_place)
+        x, y = to_place.x, to_place.y
+        if not (self.infinite or (0 <= x < self.width and 0 <= y < self.height)):
+            return NOT_PLACED
+        chunk = self._chunks.get((x >> CHUNK_SHIFT, y >> CHUNK_SHIFT))
+        if chunk is None:
+            return PLACED
+        index = ((y & CHUNK_MASK) << CHUNK_SHIFT) | (x & CHUNK_MASK)
+        matrix = coordinate_holder.body.collision_matrix
+        if not (chunk.categories[index] & matrix.contact_mask and chunk.overlapping[index] & matrix.category):
+            return PLACED
+        if _TERRAIN_COLLISION[chunk.terrain[index]].blocks(matrix):
+            return NOT_PLACED
+        # somebody is there to be pushed or overlapped: build the occupant lists
+        cell = chunk.cells.get(index)
+        return cell.is_able_to_occupy(coordinate_holder, to_place) if cell else PLACED
+
+    def can_occupy(self, coordinate_holder: CoordinateHolderProtocol, to_place: CustomVec2i) -> bool:
+        """
+        "Can I enter this cell" without building any result: two ANDs against the channel layers.
+        Counts every holder placed in the cell, including deleted ones not yet removed.
+        The layers OR the masks of everything in the tile, so two holders can look blocking
+        together when neither is on its own; is_may_be_occupied checks them one by one.
+        Footprints go through the row masks of every tile they would enter.
+        """
+        if coordinate_holder.body.footprint is not None:
+            return self._check_footprint(coordinate_holder, to_place).placed
+        x, y = to_place.x, to_place.y
+        if not (self.infinite or (0 <= x < self.width and 0 <= y < self.height)):
+            return False
+        chunk = self._chunks.get((x >> CHUNK_SHIFT, y >> CHUNK_SHIFT))
+        if chunk is None:
+            return True
+        index = ((y & CHUNK_MASK) << CHUNK_SHIFT) | (x & CHUNK_MASK)
+        matrix = coordinate_holder.body.collision_matrix
+        return not (chunk.categories[index] & matrix.block_mask and chunk.blocking[index] & matrix.category)
 
     def move(self, coordinate_holder: CoordinateHolderProtocol, to_place: CustomVec2i) -> PlaceToPositionResult:
         from_place = coordinate_holder.coordinates
-        result = self._place(coordinate_holder, to_place)
+        if to_place == from_place:
+            return PLACED
+        if coordinate_holder.body.footprint is not None:
+            # only the leading and trailing edges of the footprint change
+            result = self._move_footprint(coordinate_holder, from_place, to_place)
+        else:
+            result = self._place(coordinate_holder, to_place)
+            if result.placed:
+                # the holder stays registered, it only leaves the old cell
+                self._remove(coordinate_holder, from_place)
         if result.placed:
             self.event_bus.emit(
                 Events.MoveCoordinateHolder,
@@ -70,5 +255,632 @@ class Grid(Component, GridProtocol):
                     coordinates=to_place,
                 )
             )
-            self.remove(coordinate_holder, from_place)
+        return result
+
+    def move_many(self, moves: Sequence[tuple[CoordinateHolderProtocol, CustomVec2i]]) -> list[PlaceToPositionResult]:
+        """
+        Apply moves that only work together, such as units swapping places or a rotation,
+        as one: every holder is lifted off the grid first, then placed at its target.
+        Targets are expected not to collide with each other (MoveResolver settles that);
+        a holder whose target is refused anyway goes back where it was, sharing the tile if
+        it has to. Results are in the order of moves.
+        """
+        origins = [coordinate_holder.coordinates for coordinate_holder, _ in moves]
+        for (coordinate_holder, _), from_place in zip(moves, origins):
+            self._remove(coordinate_holder, from_place)
+        results = []
+        for (coordinate_holder, to_place), from_place in zip(moves, origins):
+            result = self._place(coordinate_holder, to_place)
+            if not result.placed and not self._place(coordinate_holder, from_place).placed:
+                self._force_back(coordinate_holder, from_place)
+            results.append(result)
+        for (coordinate_holder, to_place), result in zip(moves, results):
+            if result.placed:
+                self.event_bus.emit(
+                    Events.MoveCoordinateHolder,
+                    event_types.ObjectPositionPayload(
+                        object_name=coordinate_holder.name,
+                        coordinates=to_place,
+                    )
+                )
+        return results
+
+    def _force_back(self, coordinate_holder: CoordinateHolderProtocol, from_place: CustomVec2i):
+        coordinate_holder.coordinates = from_place
+        footprint = coordinate_holder.body.footprint
+        if footprint is not None:
+            self._stamp(coordinate_holder, from_place.x, from_place.y, footprint.stamp(), 1)
+            return
+        key = (from_place.x >> CHUNK_SHIFT, from_place.y >> CHUNK_SHIFT)
+        chunk = self._chunks.get(key)
+        if chunk is None:
+            chunk = self._chunks[key] = Chunk()
+        self._insert(coordinate_holder, from_place, key, chunk, self._local(from_place))
+
+    def get_terrain(self, coordinates: CustomVec2i) -> TerrainTypes:
+        chunk = self._chunks.get((coordinates.x >> CHUNK_SHIFT, coordinates.y >> CHUNK_SHIFT))
+        return TerrainTypes(chunk.terrain[self._local(coordinates)]) if chunk else TerrainTypes.NONE
+
+    def set_terrain(self, coordinates: CustomVec2i, terrain: TerrainTypes) -> bool:
+        """Mark a tile as static terrain: no actor, no event, one byte in the terrain layer."""
+        if not self._in_bounds(coordinates):
+            return False
+        key = (coordinates.x >> CHUNK_SHIFT, coordinates.y >> CHUNK_SHIFT)
+        chunk = self._chunks.get(key)
+        if chunk is None:
+            if terrain == TerrainTypes.NONE:
+                return True
+            chunk = self._chunks[key] = Chunk()
+        index = self._local(coordinates)
+        previous = chunk.terrain[index]
+        chunk.population += (terrain != TerrainTypes.NONE) - (previous != TerrainTypes.NONE)
+        chunk.terrain[index] = terrain
+        if _TERRAIN_COLLISION[terrain] != _TERRAIN_COLLISION[previous]:
+            self._refresh(chunk, index)
+            if _TERRAIN_COLLISION[terrain].block_mask != _TERRAIN_COLLISION[previous].block_mask:
+                self._region_versions[key] = self._region_versions.get(key, 0) + 1
+        self._release(key, chunk)
+        if terrain != previous:
+            self._record(key, index, 0, None)
+            self.event_bus.emit(Events.TerrainUpdate, event_types.TerrainUpdatePayload(coordinates, terrain, previous))
+        return True
+
+    def promote_terrain(
+            self,
+            coordinates: CustomVec2i,
+            factory: Callable[[CustomVec2i, TerrainTypes], CoordinateHolderProtocol],
+    ) -> CoordinateHolderProtocol | None:
+        """
+        Replace a terrain tile with a real holder, for tiles that need behaviours
+        (a destructible wall). The factory builds the holder; it is placed here and
+        the caller registers it wherever actors live. The tile stays opaque only if
+        the holder's body is.
+        """
+        terrain = self.get_terrain(coordinates)
+        if terrain == TerrainTypes.NONE:
+            return None
+        self.set_terrain(coordinates, TerrainTypes.NONE)
+        coordinate_holder = factory(coordinates, terrain)
+        if not self._place(coordinate_holder, coordinates).placed:
+            self.set_terrain(coordinates, terrain)
+            return None
+        return coordinate_holder
+
+    def region_version(self, region: tuple[int, int]) -> int:
+        """
+        Version of a region (a chunk key, (x >> CHUNK_SHIFT, y >> CHUNK_SHIFT)); changes
+        whenever a holder or terrain that blocks any channel enters or leaves it.
+        """
+        return self._region_versions.get(region, 0)
+
+    def passable_probe(self, coordinate_holder: CoordinateHolderProtocol) -> Callable[[int, int], bool]:
+        """can_occupy over plain ints, bound to one holder, for searches that test many tiles."""
+        chunks = self._chunks
+        infinite, width, height = self.infinite, self.width, self.height
+        matrix = coordinate_holder.body.collision_matrix
+        category, block_mask = matrix.category, matrix.block_mask
+
+        if not (category and block_mask):
+            def passable(x: int, y: int) -> bool:
+                return infinite or (0 <= x < width and 0 <= y < height)
+            return passable
+
+        def passable(x: int, y: int) -> bool:
+            if not (infinite or (0 <= x < width and 0 <= y < height)):
+                return False
+            chunk = chunks.get((x >> CHUNK_SHIFT, y >> CHUNK_SHIFT))
+            if chunk is None:
+                return True
+            index = ((y & CHUNK_MASK) << CHUNK_SHIFT) | (x & CHUNK_MASK)
+            return not (chunk.categories[index] & block_mask and chunk.blocking[index] & category)
+        return passable
+
+    def blocked_tiles(self, coordinate_holder: CoordinateHolderProtocol, region: tuple[int, int]) -> int:
+        """
+        can_occupy over a whole region (a chunk key) at once: bit i is set when local tile i,
+        (y & CHUNK_MASK) * CHUNK_SIZE + (x & CHUNK_MASK), blocks the holder. Only rows with
+        anything in them are read. Tiles beyond the edges of a bounded grid are not set.
+        """
+        chunk = self._chunks.get(region)
+        if chunk is None:
+            return 0
+        matrix = coordinate_holder.body.collision_matrix
+        category, block_mask = matrix.category, matrix.block_mask
+        if not (category and block_mask):
+            return 0
+        categories, blocking = chunk.categories, chunk.blocking
+        bits = 0
+        for row, occupied in enumerate(chunk.occupied):
+            while occupied:
+                low = occupied & -occupied
+                occupied ^= low
+                index = (row << CHUNK_SHIFT) | (low.bit_length() - 1)
+                if categories[index] & block_mask and blocking[index] & category:
+                    bits |= 1 << index
+        return bits
+
+    def terrain_probe(self) -> Callable[[int, int], bool]:
+        """Like passable_probe for a solid mover, but only terrain blocks: holders are ignored."""
+        chunks = self._chunks
+        infinite, width, height = self.infinite, self.width, self.height
+
+        def passable(x: int, y: int) -> bool:
+            if not (infinite or (0 <= x < width and 0 <= y < height)):
+                return False
+            chunk = chunks.get((x >> CHUNK_SHIFT, y >> CHUNK_SHIFT))
+            return chunk is None or not _TERRAIN_BLOCKS[chunk.terrain[((y & CHUNK_MASK) << CHUNK_SHIFT) | (x & CHUNK_MASK)]]
+        return passable
+
+    def passable_window(self, left: int, bottom: int, width: int, height: int) -> bytearray:
+        """
+        terrain_probe over a whole rectangle, flat and indexed (y - bottom) * width + (x - left):
+        1 where terrain lets a solid mover through, 0 elsewhere and outside the grid.
+        Built row by row, each chunk's slice of the row translated in one call.
+        """
+        window = bytearray(width * height)
+        x0, y0, x1, y1 = left, bottom, left + width, bottom + height
+        if not self.infinite:
+            x0, y0, x1, y1 = max(x0, 0), max(y0, 0), min(x1, self.width), min(y1, self.height)
+        if x0 >= x1 or y0 >= y1:
+            return window
+        chunks = self._chunks
+        open_row = b"\x01" * (x1 - x0)
+        for y in range(y0, y1):
+            row = (y - bottom) * width - left
+            cy, local_row = y >> CHUNK_SHIFT, (y & CHUNK_MASK) << CHUNK_SHIFT
+            # no chunk is open ground
+            window[row + x0:row + x1] = open_row
+            for cx in range(x0 >> CHUNK_SHIFT, ((x1 - 1) >> CHUNK_SHIFT) + 1):
+                chunk = chunks.get((cx, cy))
+                if chunk is None:
+                    continue
+                start, end = max(x0, cx << CHUNK_SHIFT), min(x1, (cx + 1) << CHUNK_SHIFT)
+                terrain = chunk.terrain[local_row + (start & CHUNK_MASK):local_row + ((end - 1) & CHUNK_MASK) + 1]
+                window[row + start:row + end] = terrain.translate(_TERRAIN_PASSABLE)
+        return window
+
+    def opacity_probe(self) -> Callable[[int, int], bool]:
+        """True where terrain or an opaque holder blocks line of sight; tiles outside the grid are opaque."""
+        chunks = self._chunks
+        infinite, width, height = self.infinite, self.width, self.height
+
+        def opaque(x: int, y: int) -> bool:
+            if not (infinite or (0 <= x < width and 0 <= y < height)):
+                return True
+            chunk = chunks.get((x >> CHUNK_SHIFT, y >> CHUNK_SHIFT))
+            if chunk is None:
+                return False
+            index = ((y & CHUNK_MASK) << CHUNK_SHIFT) | (x & CHUNK_MASK)
+            return _TERRAIN_OPAQUE[chunk.terrain[index]] or chunk.opaque[index] > 0
+        return opaque
+
+    def query_rect(self, min_corner: CustomVec2i, max_corner: CustomVec2i) -> Iterator[CoordinateHolderProtocol]:
+        """
+        Holders placed inside the rectangle, both corners included, footprints when any
+        of their tiles is. Lazy: only the
+        chunks overlapping the rectangle are visited, and tiles are only checked
+        in chunks crossing its border. Deleted holders are skipped. Each chunk's cells are
+        read when it is reached, so holders may be moved while iterating.
+        """
+        left, bottom, right, top = min_corner.x, min_corner.y, max_corner.x, max_corner.y
+        seen = set()
+        for (cx, cy), chunk in self._chunks_in(left, bottom, right, top):
+            x0, y0 = cx << CHUNK_SHIFT, cy << CHUNK_SHIFT
+            inside = left <= x0 and bottom <= y0 and x0 + CHUNK_MASK <= right and y0 + CHUNK_MASK <= top
+            for index, cell in list(chunk.cells.items()):
+                if not inside:
+                    x, y = x0 | (index & CHUNK_MASK), y0 | (index >> CHUNK_SHIFT)
+                    if not (left <= x <= right and bottom <= y <= top):
+                        continue
+                for coordinate_holder in list(cell.coordinate_holders.raw_items().values()):
+                    if coordinate_holder.is_deleted:
+                        continue
+                    if coordinate_holder.body.footprint is not None:
+                        # in every tile of its footprint, reported once
+                        if coordinate_holder.name in seen:
+                            continue
+                        seen.add(coordinate_holder.name)
+                    yield coordinate_holder
+
+    def query_radius(self, center: CustomVec2i, radius: float) -> Iterator[CoordinateHolderProtocol]:
+        """Holders within a euclidean radius of center, lazily, over the chunks of the bounding square."""
+        ox, oy = center.x, center.y
+        reach = int(radius)
+        radius_sq = radius * radius
+        seen = set()
+        for (cx, cy), chunk in self._chunks_in(ox - reach, oy - reach, ox + reach, oy + reach):
+            x0, y0 = cx << CHUNK_SHIFT, cy << CHUNK_SHIFT
+            for index, cell in list(chunk.cells.items()):
+                dx, dy = (x0 | (index & CHUNK_MASK)) - ox, (y0 | (index >> CHUNK_SHIFT)) - oy
+                if dx * dx + dy * dy > radius_sq:
+                    continue
+                for coordinate_holder in list(cell.coordinate_holders.raw_items().values()):
+                    if coordinate_holder.is_deleted:
+                        continue
+                    if coordinate_holder.body.footprint is not None:
+                        # in every tile of its footprint, reported once
+                        if coordinate_holder.name in seen:
+                            continue
+                        seen.add(coordinate_holder.name)
+                    yield coordinate_holder
+
+    def nearest(
+            self,
+            center: CustomVec2i,
+            predicate: Callable[[CoordinateHolderProtocol], bool] | None = None,
+            max_radius: float | None = None,
+    ) -> CoordinateHolderProtocol | None:
+        """
+        Closest holder to center (euclidean) accepted by predicate, or None. Chunks are
+        visited in rings around the center's chunk until a ring cannot hold anything
+        closer than the best match; once the rings would cover more chunks than exist,
+        the remaining chunks are scanned directly instead.
+        """
+        ox, oy = center.x, center.y
+        ocx, ocy = ox >> CHUNK_SHIFT, oy >> CHUNK_SHIFT
+        limit_sq = float("inf") if max_radius is None else max_radius * max_radius
+        best, best_sq = None, limit_sq
+        chunks = self._chunks
+
+        def scan(key: tuple[int, int], chunk: Chunk):
+            nonlocal best, best_sq
+            x0, y0 = key[0] << CHUNK_SHIFT, key[1] << CHUNK_SHIFT
+            for index, cell in chunk.cells.items():
+                dx, dy = (x0 | (index & CHUNK_MASK)) - ox, (y0 | (index >> CHUNK_SHIFT)) - oy
+                distance_sq = dx * dx + dy * dy
+                if distance_sq > best_sq or (distance_sq == best_sq and best is not None):
+                    continue
+                for coordinate_holder in cell.coordinate_holders.raw_items().values():
+                    if not coordinate_holder.is_deleted and (predicate is None or predicate(coordinate_holder)):
+                        best, best_sq = coordinate_holder, distance_sq
+                        break
+
+        ring = 0
+        while True:
+            # tiles of ring r chunks are at least (r - 1) * CHUNK_SIZE + 1 away along one axis
+            closest = max(ring - 1, 0) * CHUNK_SIZE + (ring > 0)
+            if closest * closest > best_sq:
+                return best
+            if (2 * ring + 1) ** 2 > len(chunks):
+                for key, chunk in chunks.items():
+                    if max(abs(key[0] - ocx), abs(key[1] - ocy)) >= ring:
+                        scan(key, chunk)
+                return best
+            for cy in range(ocy - ring, ocy + ring + 1):
+                on_edge = cy == ocy - ring or cy == ocy + ring
+                for cx in range(ocx - ring, ocx + ring + 1) if on_edge else (ocx - ring, ocx + ring):
+                    chunk = chunks.get((cx, cy))
+                    if chunk is not None:
+                        scan((cx, cy), chunk)
+            ring += 1
+
+    def advance_tick(self) -> int:
+        """
+        Start a new tick; changes from here on are stamped with it. History no reader
+        needs anymore is dropped: everything sealed when nobody reads it.
+        """
+        self._seal_tick()
+        self.tick += 1
+        self._prune_history(min(self._readers.values(), default=self.tick))
+        return self.tick
+
+    def add_reader(self, reader: str, since_tick: int | None = None):
+        """Keep the history from since_tick (by default the current tick) until the reader marks it read."""
+        self._readers[reader] = max(self.tick if since_tick is None else since_tick, self._history_start)
+
+    def mark_read(self, reader: str, tick: int):
+        """The reader is done with everything stamped before tick, and next asks since tick."""
+        if reader in self._readers:
+            self._readers[reader] = max(self._readers[reader], tick)
+
+    def remove_reader(self, reader: str) -> bool:
+        return self._readers.pop(reader, None) is not None
+
+    def changed_regions(self, since_tick: int) -> list[tuple[int, int]]:
+        """
+        Regions (chunk keys) with any occupancy or terrain change stamped since_tick or later,
+        most recent first. Costs O(regions returned): regions are kept ordered by last change.
+        """
+        current = self._dirty_now if self.tick >= since_tick else {}
+        regions = list(current)
+        for region, tick in reversed(self._changed_regions.items()):
+            if tick < since_tick:
+                break
+            if region not in current:
+                regions.append(region)
+        return regions
+
+    def dirty_blocks(self, region: tuple[int, int], since_tick: int) -> int:
+        """
+        Dirty bitmap of a region since_tick or later: bit by * DIRTY_BLOCKS + bx is set when a
+        tile of block (bx, by), DIRTY_BLOCK tiles square, changed. When older ticks were
+        dropped from the region's log, every block is reported dirty. Exact tiles are in
+        the journal.
+        """
+        bits = self._dirty_now.get(region, 0) if self.tick >= since_tick else 0
+        if since_tick < self._history_start and self._changed_regions.get(region, -1) >= since_tick:
+            # changed in ticks whose log was pruned
+            return _ALL_BLOCKS
+        log = self._region_logs.get(region)
+        if not log:
+            return bits
+        for tick, tiles in reversed(log):
+            if tick < since_tick:
+                return bits
+            bits |= tiles
+        return _ALL_BLOCKS if len(log) == log.maxlen else bits
+
+    def changes_since(self, since_tick: int) -> list[GridChange] | None:
+        """
+        Journal entries stamped since_tick or later, oldest first, or None when the journal
+        no longer holds all of them (or is disabled) and the caller has to rebuild instead.
+        Readers registered with add_reader are sure to find everything they did not mark read.
+        """
+        journal = self._journal
+        if journal is None or since_tick < self._history_start:
+            return None
+        changes = []
+        for tick, (cx, cy), index, delta, object_name in reversed(journal):
+            if tick < since_tick:
+                break
+            changes.append(GridChange(
+                tick,
+                (cx << CHUNK_SHIFT) | (index & CHUNK_MASK),
+                (cy << CHUNK_SHIFT) | (index >> CHUNK_SHIFT),
+                _CHANGE_KINDS[delta],
+                object_name,
+            ))
+        else:
+            if len(journal) == journal.maxlen:
+                return None
+        changes.reverse()
+        return changes
+
+    @property
+    def chunk_count(self) -> int:
+        return len(self._chunks)
+
+    def _in_bounds(self, coordinates: CustomVec2i) -> bool:
+        return self.infinite or (0 <= coordinates.x < self.width and 0 <= coordinates.y < self.height)
+
+    @staticmethod
+    def _local(coordinates: CustomVec2i) -> int:
+        return ((coordinates.y & CHUNK_MASK) << CHUNK_SHIFT) | (coordinates.x & CHUNK_MASK)
+
+    def _chunks_in(self, left: int, bottom: int, right: int, top: int) -> list[tuple[tuple[int, int], Chunk]]:
+        """Allocated chunks overlapping a tile rectangle, by lookup or by a scan of all chunks, whichever is shorter."""
+        cx0, cy0, cx1, cy1 = left >> CHUNK_SHIFT, bottom >> CHUNK_SHIFT, right >> CHUNK_SHIFT, top >> CHUNK_SHIFT
+        if cx1 < cx0 or cy1 < cy0:
+            return []
+        chunks = self._chunks
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(chunks):
+            return [(key, chunk) for key, chunk in chunks.items() if cx0 <= key[0] <= cx1 and cy0 <= key[1] <= cy1]
+        return [
+            ((cx, cy), chunk)
+            for cy in range(cy0, cy1 + 1) for cx in range(cx0, cx1 + 1)
+            if (chunk := chunks.get((cx, cy))) is not None
+        ]
+
+    def _release(self, key: tuple[int, int], chunk: Chunk):
+        if not chunk.population:
+            del self._chunks[key]
+
+    @staticmethod
+    def _is_clear(coordinate_holder: CoordinateHolderProtocol, chunk: Chunk, index: int) -> bool:
+        """True when entering the tile neither blocks nor overlaps anybody."""
+        matrix = coordinate_holder.body.collision_matrix
+        return not (chunk.categories[index] & matrix.contact_mask and chunk.overlapping[index] & matrix.category)
+
+    @staticmethod
+    def _terrain_blocks(coordinate_holder: CoordinateHolderProtocol, chunk: Chunk, index: int) -> bool:
+        return _TERRAIN_COLLISION[chunk.terrain[index]].blocks(coordinate_holder.body.collision_matrix)
+
+    def _count(self, coordinate_holder: CoordinateHolderProtocol, key: tuple[int, int], chunk: Chunk, index: int, delta: int):
+        chunk.population += delta
+        self._record(key, index, delta, coordinate_holder.name)
+        if coordinate_holder.body.opaque:
+            chunk.opaque[index] += delta
+            if chunk.opaque[index] == (delta > 0):
+                # the first opaque holder came in or the last one left
+                coordinates = CustomVec2i((key[0] << CHUNK_SHIFT) | (index & CHUNK_MASK), (key[1] << CHUNK_SHIFT) | (index >> CHUNK_SHIFT))
+                self.event_bus.emit(Events.OpacityUpdate, event_types.OpacityUpdatePayload(coordinates, delta > 0))
+        matrix = coordinate_holder.body.collision_matrix
+        if not matrix.category:
+            return
+        if delta > 0:
+            chunk.categories[index] |= matrix.category
+            chunk.blocking[index] |= matrix.block_mask
+            chunk.overlapping[index] |= matrix.contact_mask
+            self._mark_occupied(chunk, index)
+        else:
+            # an OR cannot be taken back: rebuild the tile from what is left in it
+            self._refresh(chunk, index)
+        if matrix.block_mask:
+            self._region_versions[key] = self._region_versions.get(key, 0) + 1
+
+    @classmethod
+    def _refresh(cls, chunk: Chunk, index: int):
+        """Recompute the channel layers of one tile from its terrain and holders."""
+        terrain = _TERRAIN_COLLISION[chunk.terrain[index]]
+        categories, blocking, overlapping = terrain.category, terrain.block_mask, terrain.contact_mask
+        cell = chunk.cells.get(index)
+        if cell is not None:
+            for occupant in cell.coordinate_holders.raw_items().values():
+                matrix = occupant.body.collision_matrix
+                categories |= matrix.category
+                blocking |= matrix.block_mask
+                overlapping |= matrix.contact_mask
+        chunk.categories[index] = categories
+        chunk.blocking[index] = blocking
+        chunk.overlapping[index] = overlapping
+        cls._mark_occupied(chunk, index)
+
+    def _record(self, key: tuple[int, int], index: int, delta: int, object_name: str | None):
+        """Stamp a change of one tile with the current tick; delta 1 enter, -1 leave, 0 terrain."""
+        dirty = self._dirty_now
+        dirty[key] = dirty.get(key, 0) | _DIRTY_BITS[index]
+        if self._journal is not None:
+            # plain tuples here, GridChange is only built for whoever reads the journal
+            self._journal.append((self.tick, key, index, delta, object_name))
+
+    def _seal_tick(self):
+        tick = self.tick
+        changed = self._changed_regions
+        logs = self._region_logs
+        for key, tiles in self._dirty_now.items():
+            log = logs.get(key)
+            if log is None:
+                log = logs[key] = deque(maxlen=REGION_LOG_LENGTH)
+            else:
+                logs.move_to_end(key)
+            log.append((tick, tiles))
+            changed[key] = tick
+            changed.move_to_end(key)
+        self._dirty_now = {}
+
+    def _prune_history(self, horizon: int):
+        """Drop region logs and journal entries stamped before horizon."""
+        if horizon <= self._history_start:
+            return
+        self._history_start = horizon
+        logs = self._region_logs
+        # oldest last change first: a log whose last entry is old is old all through
+        while logs:
+            key, log = next(iter(logs.items()))
+            if log[-1][0] >= horizon:
+                break
+            del logs[key]
+        journal = self._journal
+        while journal and journal[0][0] < horizon:
+            journal.popleft()
+
+    @staticmethod
+    def _mark_occupied(chunk: Chunk, index: int):
+        bit = 1 << (index & CHUNK_MASK)
+        if chunk.categories[index]:
+            chunk.occupied[index >> CHUNK_SHIFT] |= bit
+        else:
+            chunk.occupied[index >> CHUNK_SHIFT] &= ~bit
+
+    # ---- footprints ----
+    def _footprint_in_bounds(self, footprint: Footprint, x: int, y: int) -> bool:
+        return self.infinite or (0 <= x and x + footprint.width <= self.width and 0 <= y and y + footprint.height <= self.height)
+
+    def _row_bits(self, y: int, left: int, width: int) -> int:
+        """Occupied tiles left .. left + width - 1 of row y as bits, bit i for x = left + i."""
+        chunks = self._chunks
+        cy, row = y >> CHUNK_SHIFT, y & CHUNK_MASK
+        bits = 0
+        for cx in range(left >> CHUNK_SHIFT, ((left + width - 1) >> CHUNK_SHIFT) + 1):
+            chunk = chunks.get((cx, cy))
+            if chunk is not None and chunk.occupied[row]:
+                shift = (cx << CHUNK_SHIFT) - left
+                bits |= chunk.occupied[row] << shift if shift >= 0 else chunk.occupied[row] >> -shift
+        return bits & ((1 << width) - 1)
+
+    def _check_rows(self, coordinate_holder: CoordinateHolderProtocol, x: int, y: int, rows: FootprintRows) -> PlaceToPositionResult:
+        """
+        Collision test of footprint rows (Footprint.stamp or an edge) around anchor (x, y):
+        a mask AND per row, then the occupant lists only for tiles where something is.
+        """
+        matrix = coordinate_holder.body.collision_matrix
+        if not (matrix.category and matrix.contact_mask):
+            return PLACED
+        left = x - 1
+        blocked = {}
+        overlapped = {}
+        terrain_blocked = False
+        for offset, bits in rows:
+            row_y = y + offset
+            hits = self._row_bits(row_y, left, bits.bit_length()) & bits
+            while hits:
+                low = hits & -hits
+                hits ^= low
+                tile_x = left + low.bit_length() - 1
+                chunk = self._chunks[(tile_x >> CHUNK_SHIFT, row_y >> CHUNK_SHIFT)]
+                index = ((row_y & CHUNK_MASK) << CHUNK_SHIFT) | (tile_x & CHUNK_MASK)
+                if _TERRAIN_COLLISION[chunk.terrain[index]].blocks(matrix):
+                    terrain_blocked = True
+                    continue
+                cell = chunk.cells.get(index)
+                if cell is not None:
+                    result = cell.is_able_to_occupy(coordinate_holder, CustomVec2i(tile_x, row_y))
+                    blocked.update(result.blocked.raw_items())
+                    overlapped.update(result.overlapped.raw_items())
+        # a holder never collides with the rest of its own footprint
+        blocked.pop(coordinate_holder.name, None)
+        overlapped.pop(coordinate_holder.name, None)
+        if blocked:
+            return PlaceToPositionResult(placed=False, blocked=CoordinateHolderCollection(blocked))
+        if terrain_blocked:
+            return NOT_PLACED
+        if overlapped:
+            return PlaceToPositionResult(placed=True, overlapped=CoordinateHolderCollection(overlapped))
+        return PLACED
+
+    def _stamp(self, coordinate_holder: CoordinateHolderProtocol, x: int, y: int, rows: FootprintRows, delta: int) -> int:
+        """Add the holder to (delta 1) or take it out of (delta -1) the tiles of rows around anchor (x, y)."""
+        chunks = self._chunks
+        left = x - 1
+        touched = 0
+        for offset, bits in rows:
+            row_y = y + offset
+            while bits:
+                low = bits & -bits
+                bits ^= low
+                tile_x = left + low.bit_length() - 1
+                key = (tile_x >> CHUNK_SHIFT, row_y >> CHUNK_SHIFT)
+                index = ((row_y & CHUNK_MASK) << CHUNK_SHIFT) | (tile_x & CHUNK_MASK)
+                chunk = chunks.get(key)
+                if delta > 0:
+                    if chunk is None:
+                        chunk = chunks[key] = Chunk()
+                    cell = chunk.cells.get(index)
+                    if cell is None:
+                        cell = chunk.cells[index] = Cell(CustomVec2i(tile_x, row_y))
+                    cell.coordinate_holders.add(coordinate_holder)
+                else:
+                    cell = chunk.cells.get(index) if chunk is not None else None
+                    if cell is None or not cell.remove(coordinate_holder):
+                        continue
+                    if not cell.coordinate_holders.raw_items():
+                        del chunk.cells[index]
+                self._count(coordinate_holder, key, chunk, index, delta)
+                if delta < 0:
+                    self._release(key, chunk)
+                touched += 1
+        return touched
+
+    def _check_footprint(self, coordinate_holder: CoordinateHolderProtocol, to_place: CustomVec2i) -> PlaceToPositionResult:
+        """Probe for a placed footprint holder going from its coordinates to to_place."""
+        footprint = coordinate_holder.body.footprint
+        if not self._footprint_in_bounds(footprint, to_place.x, to_place.y):
+            return NOT_PLACED
+        from_place = coordinate_holder.coordinates
+        dx, dy = to_place.x - from_place.x, to_place.y - from_place.y
+        if abs(dx) <= 1 and abs(dy) <= 1:
+            # a step: only the tiles about to be entered can hold anybody else
+            return self._check_rows(coordinate_holder, from_place.x, from_place.y, footprint.edges(dx, dy)[0])
+        return self._check_rows(coordinate_holder, to_place.x, to_place.y, footprint.stamp())
+
+    def _move_footprint(self, coordinate_holder: CoordinateHolderProtocol, from_place: CustomVec2i, to_place: CustomVec2i) -> PlaceToPositionResult:
+        footprint = coordinate_holder.body.footprint
+        if not self._footprint_in_bounds(footprint, to_place.x, to_place.y):
+            return NOT_PLACED
+        dx, dy = to_place.x - from_place.x, to_place.y - from_place.y
+        if abs(dx) <= 1 and abs(dy) <= 1:
+            leading, trailing = footprint.edges(dx, dy)
+            result = self._check_rows(coordinate_holder, from_place.x, from_place.y, leading)
+            if result.placed:
+                self._stamp(coordinate_holder, from_place.x, from_place.y, leading, 1)
+                self._stamp(coordinate_holder, from_place.x, from_place.y, trailing, -1)
+        else:
+            # a jump: lift the whole footprint, the two positions may still overlap
+            stamp = footprint.stamp()
+            self._stamp(coordinate_holder, from_place.x, from_place.y, stamp, -1)
+            result = self._check_rows(coordinate_holder, to_place.x, to_place.y, stamp)
+            landing = to_place if result.placed else from_place
+            self._stamp(coordinate_holder, landing.x, landing.y, stamp, 1)
+        if result.placed:
+            coordinate_holder.coordinates = to_place
         return result
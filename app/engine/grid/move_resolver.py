@@ -0,0 +1,161 @@
+from app.core.vectors import CustomVec2i
+from app.engine.grid.types import PlaceToPositionResult, NOT_PLACED
+from app.protocols.engine.grid.grid_protocol import GridProtocol
+from app.protocols.objects.coordinate_holder_protocol import CoordinateHolderProtocol
+
+
+class MoveIntent:
+    __slots__ = ("coordinate_holder", "name", "direction", "target", "force")
+
+    def __init__(self, coordinate_holder: CoordinateHolderProtocol, direction: CustomVec2i, force: int):
+        self.coordinate_holder = coordinate_holder
+        self.name = coordinate_holder.name
+        self.direction = direction
+        self.target = coordinate_holder.coordinates + direction
+        self.force = force
+
+
+class MoveResolver:
+    """
+    Settles every move asked for during a tick together instead of one at a time, so a
+    queue of units walking down a corridor all step at once, and the outcome does not
+    depend on the order the units acted in.
+
+    resolve() builds a "wants tile" graph in one linear pass:
+    - each target tile goes to one mover: the strongest force, then the lowest name
+    - a winner depends on the movers standing in its target; anything else that blocks
+      it there (terrain, holders with no move) stops it outright
+    - strongly connected components of the graph, in dependency order (Tarjan), decide:
+      a chain moves when its head's tile is free, a cycle (two units swapping places, a
+      rotation) moves as a whole, swaps only when allow_swaps
+    Moves that go through are committed with one Grid.move_many. Holders with a footprint
+    are not part of the graph; they move one by one afterwards, by name.
+    """
+
+    def __init__(self, grid: GridProtocol, allow_swaps: bool = True):
+        self.grid = grid
+        self.allow_swaps = allow_swaps
+        self._intents: dict[str, MoveIntent] = {}
+
+    def submit(self, coordinate_holder: CoordinateHolderProtocol, direction: CustomVec2i, force: int = 0):
+        """Ask for a move this tick; a later request of the same holder replaces the earlier one."""
+        if direction.is_zero():
+            self._intents.pop(coordinate_holder.name, None)
+            return
+        self._intents[coordinate_holder.name] = MoveIntent(coordinate_holder, direction, force)
+
+    def clear(self):
+        self._intents.clear()
+
+    def __len__(self) -> int:
+        return len(self._intents)
+
+    def resolve(self) -> list[tuple[MoveIntent, PlaceToPositionResult]]:
+        """Apply the submitted moves and forget them. Results come sorted by holder name."""
+        intents, self._intents = self._intents, {}
+        grid = self.grid
+
+        # one winner per target tile
+        claims: dict[tuple[int, int], MoveIntent] = {}
+        big: list[MoveIntent] = []
+        for intent in intents.values():
+            if intent.coordinate_holder.body.footprint is not None or intent.coordinate_holder.is_deleted:
+                big.append(intent)
+                continue
+            key = (intent.target.x, intent.target.y)
+            rival = claims.get(key)
+            if rival is None or (-intent.force, intent.name) < (-rival.force, rival.name):
+                claims[key] = intent
+        winners = {intent.name: intent for intent in claims.values()}
+
+        # what is in the way of each winner
+        results: dict[str, PlaceToPositionResult] = {}
+        depends: dict[str, list[str]] = {}
+        stopped: set[str] = set()
+        for name, intent in winners.items():
+            result = grid.is_may_be_occupied(intent.coordinate_holder, intent.target)
+            results[name] = result
+            blockers = result.blocked.raw_items()
+            if result.placed:
+                depends[name] = []
+            elif not blockers:
+                depends[name] = []
+                stopped.add(name)  # terrain or the edge of the grid
+            else:
+                depends[name] = [blocker for blocker in blockers if blocker in winners]
+                if len(depends[name]) != len(blockers):
+                    stopped.add(name)
+
+        moving = self._settle(winners, depends, stopped)
+
+        # held back: the probe says who is in the way; losers of a tile get nothing to push
+        resolved: dict[str, PlaceToPositionResult] = {
+            name: results[name] if name in winners else NOT_PLACED for name in intents
+        }
+        moves = sorted((winners[name] for name in moving), key=lambda intent: intent.name)
+        for intent, result in zip(moves, grid.move_many([(intent.coordinate_holder, intent.target) for intent in moves])):
+            resolved[intent.name] = result
+        for intent in sorted(big, key=lambda intent: intent.name):
+            if not intent.coordinate_holder.is_deleted:
+                resolved[intent.name] = grid.move(intent.coordinate_holder, intent.target)
+
+        return [(intents[name], resolved[name]) for name in sorted(resolved)]
+
+    def _settle(self, winners: dict[str, MoveIntent], depends: dict[str, list[str]], stopped: set[str]) -> set[str]:
+        """
+        Winners that can move: Tarjan's strongly connected components, iteratively. A
+        component is emitted only after every component it depends on, so each is decided
+        once, from its members and the outcome of what they wait for.
+        """
+        allow_swaps = self.allow_swaps
+        order: dict[str, int] = {}
+        low: dict[str, int] = {}
+        stack: list[str] = []
+        on_stack: set[str] = set()
+        moving: set[str] = set()
+
+        for root in winners:
+            if root in order:
+                continue
+            order[root] = low[root] = len(order)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, 0)]
+            while work:
+                node, position = work[-1]
+                dependencies = depends[node]
+                if position < len(dependencies):
+                    work[-1] = (node, position + 1)
+                    dependency = dependencies[position]
+                    if dependency not in order:
+                        order[dependency] = low[dependency] = len(order)
+                        stack.append(dependency)
+                        on_stack.add(dependency)
+                        work.append((dependency, 0))
+                    elif dependency in on_stack:
+                        low[node] = min(low[node], order[dependency])
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] != order[node]:
+                    continue
+
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                members = set(component)
+                free = (allow_swaps or len(component) != 2) and all(
+                    member not in stopped
+                    and all(dependency in members or dependency in moving for dependency in depends[member])
+                    for member in component
+                )
+                if free:
+                    moving.update(component)
+        return moving
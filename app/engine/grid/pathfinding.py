@@ -0,0 +1,165 @@
+import heapq
+from array import array
+from collections import OrderedDict
+from math import sqrt
+from typing import Iterator
+
+from app.core.vectors import CustomVec2i
+from app.engine.grid.chunk import CHUNK_SHIFT
+from app.protocols.engine.grid.grid_protocol import GridProtocol
+from app.protocols.objects.coordinate_holder_protocol import CoordinateHolderProtocol
+
+SQRT2 = sqrt(2)
+
+_ORTHOGONAL = ((1, 0), (-1, 0), (0, 1), (0, -1))
+_DIAGONAL = ((1, 1), (1, -1), (-1, 1), (-1, -1))
+
+# tiles packed into one int: x and y shifted into the non-negative 32-bit range
+_OFFSET = 1 << 31
+_LOW = (1 << 32) - 1
+
+
+def _pack(x: int, y: int) -> int:
+    return ((y + _OFFSET) << 32) | (x + _OFFSET)
+
+
+def iter_path(path: array) -> Iterator[CustomVec2i]:
+    """Steps of a path returned by Pathfinder.find_path, as vectors."""
+    for i in range(0, len(path), 2):
+        yield CustomVec2i(path[i], path[i + 1])
+
+
+class Pathfinder:
+    """
+    A* over a GridProtocol. A tile is passable for a mover when the grid's occupancy
+    layers say nothing there blocks it (CollisionMatrix.blocks, blocking terrain).
+    Paths are array('i') of x, y pairs from the first step to the goal, start excluded.
+    The goal tile itself is always accepted, so a path can lead onto a blocking target.
+
+    Results are cached per (start, goal, mover channels), with the version of every
+    region the search looked at. Rejected tiles and the goal count as looked at.
+    A hit is served only while none of those regions had its blocking changed.
+    Searches cut short by max_expansions are not cached.
+    Cached arrays are shared, do not modify them.
+    """
+
+    def __init__(self, grid: GridProtocol, diagonal: bool = False, max_expansions: int = 200_000, cache_size: int = 1024):
+        self.grid = grid
+        self.diagonal = diagonal
+        self.max_expansions = max_expansions
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache: OrderedDict[tuple, tuple[array | None, tuple[tuple[tuple[int, int], int], ...]]] = OrderedDict()
+
+    def find_path(self, mover: CoordinateHolderProtocol, goal: CustomVec2i, start: CustomVec2i | None = None) -> array | None:
+        """Path from start (the mover's position by default) to goal, or None if none was found."""
+        start = mover.coordinates if start is None else start
+        matrix = mover.body.collision_matrix
+        key = (start.x, start.y, goal.x, goal.y, matrix.category, matrix.block_mask)
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            path, regions = cached
+            region_version = self.grid.region_version
+            if all(region_version(region) == version for region, version in regions):
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return path
+            del self._cache[key]
+
+        self.misses += 1
+        path, watched = self._search(mover, start.x, start.y, goal.x, goal.y)
+        if watched is None:
+            return path  # out of budget: a bigger one, or a later grid, may still find a path
+        region_version = self.grid.region_version
+        self._cache[key] = (path, tuple((region, region_version(region)) for region in watched))
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return path
+
+    def clear_cache(self):
+        self._cache.clear()
+
+    def _search(self, mover: CoordinateHolderProtocol, sx: int, sy: int, gx: int, gy: int) -> tuple[array | None, set[tuple[int, int]] | None]:
+        """The path and the regions looked at; no regions when the budget ran out first."""
+        passable = self.grid.passable_probe(mover)
+        diagonal = self.diagonal
+        start, goal = _pack(sx, sy), _pack(gx, gy)
+        # regions of every tile passable() was asked about: opening a rejected one must
+        # invalidate the result as much as closing one on the path
+        watched: set[tuple[int, int]] = {(sx >> CHUNK_SHIFT, sy >> CHUNK_SHIFT), (gx >> CHUNK_SHIFT, gy >> CHUNK_SHIFT)}
+        watch = watched.add
+        if start == goal:
+            return array("i"), watched
+
+        def heuristic(x: int, y: int) -> float:
+            dx, dy = abs(x - gx), abs(y - gy)
+            if diagonal:  # octile
+                return dx + dy + (SQRT2 - 2) * min(dx, dy)
+            return dx + dy  # manhattan
+
+        came_from: dict[int, int] = {start: start}
+        cost: dict[int, float] = {start: 0.0}
+        # (f, h, g, node): ties go to the node closer to the goal
+        open_heap = [(heuristic(sx, sy), 0.0, 0.0, start)]
+        budget = self.max_expansions
+
+        while open_heap:
+            _, _, base, node = heapq.heappop(open_heap)
+            if node == goal:
+                return self._reconstruct(came_from, start, goal), watched
+            if base > cost[node]:
+                continue  # stale entry, reached cheaper since
+            budget -= 1
+            if budget < 0:
+                return None, None
+
+            x, y = (node & _LOW) - _OFFSET, (node >> 32) - _OFFSET
+
+            for dx, dy in _ORTHOGONAL:
+                nx, ny = x + dx, y + dy
+                watch((nx >> CHUNK_SHIFT, ny >> CHUNK_SHIFT))
+                neighbour = ((ny + _OFFSET) << 32) | (nx + _OFFSET)
+                if neighbour != goal and not passable(nx, ny):
+                    continue
+                g = base + 1.0
+                if g < cost.get(neighbour, float("inf")):
+                    cost[neighbour] = g
+                    came_from[neighbour] = node
+                    h = heuristic(nx, ny)
+                    heapq.heappush(open_heap, (g + h, h, g, neighbour))
+
+            if diagonal:
+                for dx, dy in _DIAGONAL:
+                    nx, ny = x + dx, y + dy
+                    watch((nx >> CHUNK_SHIFT, y >> CHUNK_SHIFT))
+                    watch((x >> CHUNK_SHIFT, ny >> CHUNK_SHIFT))
+                    watch((nx >> CHUNK_SHIFT, ny >> CHUNK_SHIFT))
+                    # no corner cutting: movement resolves one axis at a time
+                    if not (passable(nx, y) and passable(x, ny)):
+                        continue
+                    neighbour = ((ny + _OFFSET) << 32) | (nx + _OFFSET)
+                    if neighbour != goal and not passable(nx, ny):
+                        continue
+                    g = base + SQRT2
+                    if g < cost.get(neighbour, float("inf")):
+                        cost[neighbour] = g
+                        came_from[neighbour] = node
+                        h = heuristic(nx, ny)
+                        heapq.heappush(open_heap, (g + h, h, g, neighbour))
+
+        return None, watched
+
+    @staticmethod
+    def _reconstruct(came_from: dict[int, int], start: int, goal: int) -> array:
+        nodes = []
+        node = goal
+        while node != start:
+            nodes.append(node)
+            node = came_from[node]
+        path = array("i")
+        for node in reversed(nodes):
+            path.append((node & _LOW) - _OFFSET)
+            path.append((node >> 32) - _OFFSET)
+        return path
@@ -1,6 +1,9 @@
 from dataclasses import dataclass, field
+from enum import Enum, IntEnum, auto
+from typing import NamedTuple
 
 from app.collections.coordinate_holder_collection import CoordinateHolderCollection
+from app.components.physics.body import CollisionChannel, CollisionMatrix
 
 
 @dataclass
@@ -8,3 +11,54 @@ class PlaceToPositionResult:
     placed: bool = False
     blocked: CoordinateHolderCollection = field(default_factory=CoordinateHolderCollection)
     overlapped: CoordinateHolderCollection = field(default_factory=CoordinateHolderCollection)
+
+
+# shared results for probes that touch nobody; callers only read them
+PLACED = PlaceToPositionResult(placed=True)
+NOT_PLACED = PlaceToPositionResult(placed=False)
+
+
+class TerrainTypes(IntEnum):
+    """Tile classes of the grid's terrain layer, stored one byte per tile."""
+    NONE = 0
+    WALL = 1
+    WATER = 2
+    OBSTACLE = 3
+
+
+# terrain collides like a body in the WORLD (AREA for water) channel; low obstacles
+# stop units but not projectiles
+TerrainCollision: dict[TerrainTypes, CollisionMatrix] = {
+    TerrainTypes.NONE: CollisionMatrix(),
+    TerrainTypes.WALL: CollisionMatrix(category=CollisionChannel.WORLD, block_mask=CollisionChannel.ALL),
+    TerrainTypes.WATER: CollisionMatrix(category=CollisionChannel.AREA, overlap_mask=CollisionChannel.ALL),
+    TerrainTypes.OBSTACLE: CollisionMatrix(
+        category=CollisionChannel.WORLD,
+        block_mask=CollisionChannel.WORLD | CollisionChannel.PAWN,
+        overlap_mask=CollisionChannel.ALL,
+    ),
+}
+
+
+# terrain that blocks line of sight; water and low obstacles can be seen across
+TerrainOpaque: dict[TerrainTypes, bool] = {
+    TerrainTypes.NONE: False,
+    TerrainTypes.WALL: True,
+    TerrainTypes.WATER: False,
+    TerrainTypes.OBSTACLE: False,
+}
+
+
+class GridChangeKinds(Enum):
+    ENTER = auto()  # a holder was placed in or moved into the tile
+    LEAVE = auto()  # a holder was removed from or moved out of the tile
+    TERRAIN = auto()
+
+
+class GridChange(NamedTuple):
+    """One entry of Grid's change journal."""
+    tick: int
+    x: int
+    y: int
+    kind: GridChangeKinds
+    object_name: str | None  # None for terrain
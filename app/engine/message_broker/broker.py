@@ -2,6 +2,7 @@ from collections import deque
 from typing import Optional
 
 from app.behaviours.types import BehaviourAction
+from app.engine.message_broker.pending_actors import PendingActors
 from app.engine.message_broker.types import Message
 from app.protocols.engine.message_broker.broker_protocol import MessageBrokerProtocol
 from app.protocols.objects.actor_protocol import ActorProtocol
@@ -11,6 +12,8 @@ class MessageBroker(MessageBrokerProtocol):
     def __init__(self):
         self.last_message_number = 0
         self.promise_queue: dict[int, deque[BehaviourAction]] = {}
+        # responders holding actions for the command pipeline
+        self.pending_actors: PendingActors = PendingActors()
 
     def clear_history(self) -> None:
         self.promise_queue.clear()
@@ -26,6 +29,7 @@ class MessageBroker(MessageBrokerProtocol):
 
         if promise:
             responder.pending_actions.extend(promise)
+            self.pending_actors.add(responder)
 
         return self.last_message_number
 
@@ -0,0 +1,31 @@
+from app.protocols.objects.actor_protocol import ActorProtocol
+
+
+class PendingActors:
+    """
+    Actors that were handed pending_actions, in the order they got them, so the command
+    pipeline drains only those instead of filtering every actor. Intrusive: membership is
+    the actor's own is_pending flag, adding is a flag test and an append.
+    An actor whose actions were already taken by the time it is drained simply yields none.
+    """
+
+    def __init__(self):
+        self._actors: list[ActorProtocol] = []
+
+    def add(self, actor: ActorProtocol) -> None:
+        if not actor.is_pending:
+            actor.is_pending = True
+            self._actors.append(actor)
+
+    def drain(self) -> list[ActorProtocol]:
+        """Take every pending actor out of the set; deleted ones are dropped."""
+        actors, self._actors = self._actors, []
+        for actor in actors:
+            actor.is_pending = False
+        return [actor for actor in actors if not actor.is_deleted]
+
+    def clear(self) -> None:
+        self.drain()
+
+    def __len__(self) -> int:
+        return len(self._actors)
@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Callable, Dict, Optional, Set
 
 import arcade
 
@@ -10,11 +10,13 @@ from app.collections.animation_collection import AnimationCollection
 from app.collections.coordinate_holder_collection import CoordinateHolderCollection
 from app.config import Behaviours, NpcAnimations, animation_paths, UnitStates
 from app.components.geometry.shape import Shape
-from app.components.physics.body import Body, CollisionMatrix, CollisionResponse
+from app.components.physics.body import Body, CollisionChannel, CollisionMatrix, CollisionResponse
 from app.core.vectors import CustomVec2i
 from app.config import Y_MODIFIER
+from app.core.debug import Debug
 from app.engine.game_view.tmx_animation_parser import TMXAnimationParser
 from app.engine.grid.grid import Grid
+from app.engine.grid.types import TerrainTypes
 from app.engine.message_broker.types import Controls, KeyBinding, MessageBody, MessageTypes, StopPayload, MovePayload
 from app.components.objects.coordinate_holder import CoordinateHolder
 from app.components.objects.puppeteer import Puppeteer
@@ -39,19 +41,29 @@ class Level:
     tmx_parser: Optional[TMXAnimationParser] = None  # TMXAnimationParser instance
 
     def place_all_coordinate_holders(self):
-        """Place all coordinate holders on the grid"""
-        for coordinate_holder in self.actors_collection.get_by_type(CoordinateHolder, CoordinateHolderCollection):
-            self.grid.place(coordinate_holder, coordinate_holder.coordinates)
+        """Place all coordinate holders on the grid, announced to renderers as one batch"""
+        coordinate_holders = self.actors_collection.get_by_type(CoordinateHolder, CoordinateHolderCollection)
+        for coordinate_holder in self.grid.place_many(coordinate_holders.raw_items().values()):
+            Debug.log(f"{coordinate_holder.name} could not be placed at {coordinate_holder.coordinates}", __file__)
+
+    def promote_terrain(self, position: CustomVec2i,
+                        factory: Callable[[CustomVec2i, TerrainTypes], CoordinateHolder]) -> Optional[CoordinateHolder]:
+        """Turn a terrain tile into a real actor, e.g. once a wall has to react to hits"""
+        coordinate_holder = self.grid.promote_terrain(position, factory)
+        if coordinate_holder is not None:
+            self.actors_collection.add(coordinate_holder)
+        return coordinate_holder
 
 
 class LevelBuilder(ABC):
-    def __init__(self, name: str, width: int, height: int, map_path: Optional[Path] = None):
+    def __init__(self, name: str, width: int, height: int, map_path: Optional[Path] = None, infinite: bool = False):
         self.level = Level()
         self.level.name = name
         self.level.grid_width = width
         self.level.grid_height = height
         self.level.current_map = map_path
-        self.level.grid = Grid(width=width, height=height)
+        # infinite (TMX infinite="1") maps get an unbounded grid; width/height are then only the view size
+        self.level.grid = Grid(width=width, height=height, infinite=infinite)
 
     @abstractmethod
     def create_entities(self):
@@ -93,7 +105,7 @@ class LevelBuilder(ABC):
 
     def create_wall(self, position: CustomVec2i, height: int = 100, weight: int = 100) -> StaticObject:
         """Create a wall static object"""
-        body = Body(CollisionMatrix(response=CollisionResponse.BLOCK))
+        body = Body(CollisionMatrix(category=CollisionChannel.WORLD, block_mask=CollisionChannel.ALL), opaque=True)
         shape = None  # No need to draw, it is drawn by a scene
         wall = StaticObject(body=body, shape=shape, coordinates=position, height=height, weight=weight)
         return wall
@@ -183,40 +195,53 @@ class LevelBuilder(ABC):
         return self.level.tmx_parser
 
     def create_static_objects_from_tmx_layer(self, layer_name: str, 
-                                           tile_to_object_map: Optional[Dict[int, str]] = None):
-        """Create static objects from TMX layer tiles
+                                           tile_to_object_map: Optional[Dict[int, str]] = None,
+                                           actor_tiles: Optional[Set[int]] = None):
+        """Fill the grid's terrain layer from TMX layer tiles
         
         Args:
             layer_name: Name of the TMX layer to process
             tile_to_object_map: Optional mapping of tile_id -> object_type
                                If None, all non-zero tiles become walls
+            actor_tiles: Optional tile ids that need behaviours (e.g. destructible walls)
+                         and become StaticObject actors; all other tiles stay terrain only
         """
         parser = self.get_tmx_parser()
-        if not parser or layer_name not in parser.map_layers:
+        if not parser or not parser.has_layer(layer_name):
             return
 
-        layer_data = parser.map_layers[layer_name]
-        
-        for y, row in enumerate(layer_data):
-            for x, tile_id in enumerate(row):
-                if tile_id != 0:  # Non-empty tile
-                    # Apply Y_MODIFIER to handle coordinate system differences
-                    if Y_MODIFIER == -1:
-                        # Arcade coordinate system: flip Y to match game grid
-                        adjusted_y = parser.map_height - 1 - y
-                    else:
-                        # Pygame coordinate system: use Y as-is
-                        adjusted_y = y
-                    position = CustomVec2i(x, adjusted_y)
-                    
-                    if tile_to_object_map and tile_id in tile_to_object_map:
-                        object_type = tile_to_object_map[tile_id]
-                        static_obj = self._create_static_object_by_type(position, object_type)
-                    else:
-                        # Default to wall
-                        static_obj = self.create_wall(position)
-                    
-                    self.level.actors_collection.add(static_obj)
+        grid = self.level.grid
+
+        for x, y, tile_id in parser.iter_layer_tiles(layer_name):
+            # Apply Y_MODIFIER to handle coordinate system differences
+            if Y_MODIFIER == -1:
+                # Arcade coordinate system: flip Y to match game grid
+                adjusted_y = parser.map_height - 1 - y
+            else:
+                # Pygame coordinate system: use Y as-is
+                adjusted_y = y
+            position = CustomVec2i(x, adjusted_y)
+
+            if tile_to_object_map and tile_id in tile_to_object_map:
+                object_type = tile_to_object_map[tile_id]
+            else:
+                # Default to wall
+                object_type = "wall"
+
+            if actor_tiles and tile_id in actor_tiles:
+                self.level.actors_collection.add(self._create_static_object_by_type(position, object_type))
+            else:
+                grid.set_terrain(position, self._terrain_by_type(object_type))
+
+    @staticmethod
+    def _terrain_by_type(object_type: str) -> TerrainTypes:
+        """Terrain class for an object type string, walls for unknown types"""
+        terrain = TerrainTypes.__members__.get(object_type.upper(), TerrainTypes.WALL)
+        return TerrainTypes.WALL if terrain == TerrainTypes.NONE else terrain
+
+    def create_static_object_from_terrain(self, position: CustomVec2i, terrain: TerrainTypes) -> StaticObject:
+        """Factory for Level.promote_terrain: the StaticObject a terrain tile stands for"""
+        return self._create_static_object_by_type(position, terrain.name)
 
     def _create_static_object_by_type(self, position: CustomVec2i, object_type: str) -> StaticObject:
         """Create different types of static objects based on type string"""
@@ -239,7 +264,12 @@ class LevelBuilder(ABC):
 
     def create_obstacle(self, position: CustomVec2i, height: int = 75, weight: int = 50) -> StaticObject:
         """Create a general obstacle static object"""
-        body = Body(CollisionMatrix(response=CollisionResponse.BLOCK))
+        # low enough to shoot over
+        body = Body(CollisionMatrix(
+            category=CollisionChannel.WORLD,
+            block_mask=CollisionChannel.WORLD | CollisionChannel.PAWN,
+            overlap_mask=CollisionChannel.ALL,
+        ))
         shape = None  # No need to draw, it is drawn by the scene
         obstacle = StaticObject(body=body, shape=shape, coordinates=position, height=height, weight=weight)
         return obstacle
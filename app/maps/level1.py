@@ -1,5 +1,6 @@
 from app.config import NpcAnimations, UnitStates
 from app.core.vectors import CustomVec2i
+from app.engine.grid.types import TerrainTypes
 from app.engine.message_broker.types import Controls
 from app.maps.level import LevelBuilder, map_dir
 from app.components.objects.types import UnitStats
@@ -76,6 +77,4 @@ class Level1Builder(LevelBuilder):
 
     def add_wall(self, position: CustomVec2i):
         """Add a wall to the level"""
-        wall = self.create_wall(position)
-        self.level.actors_collection.add(wall)
-        self.level.grid.place(wall, wall.coordinates)
+        self.level.grid.set_terrain(position, TerrainTypes.WALL)
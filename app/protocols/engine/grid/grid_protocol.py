@@ -1,6 +1,6 @@
-from typing import Protocol
+from typing import Protocol, Callable, Iterable, Iterator, Sequence
 from app.core.vectors import CustomVec2i
-from app.engine.grid.types import PlaceToPositionResult
+from app.engine.grid.types import PlaceToPositionResult, TerrainTypes, GridChange
 from app.protocols.engine.grid.cell_protocol import CellProtocol
 from app.protocols.objects.coordinate_holder_protocol import CoordinateHolderProtocol
 
@@ -8,9 +8,41 @@ from app.protocols.objects.coordinate_holder_protocol import CoordinateHolderPro
 class GridProtocol(Protocol):
     width: int
     height: int
+    tick: int
 
     def get_cell(self, coordinates: CustomVec2i) -> CellProtocol | None: ...
     def place(self, coordinate_holder: CoordinateHolderProtocol, to_place: CustomVec2i) -> PlaceToPositionResult: ...
+    def place_many(self, coordinate_holders: Iterable[CoordinateHolderProtocol]) -> list[CoordinateHolderProtocol]: ...
     def remove(self, coordinate_holder: CoordinateHolderProtocol, from_place: CustomVec2i) -> bool: ...
     def is_may_be_occupied(self, coordinate_holder: CoordinateHolderProtocol, to_place: CustomVec2i) -> PlaceToPositionResult: ...
     def move(self, coordinate_holder: CoordinateHolderProtocol, to_place: CustomVec2i) -> PlaceToPositionResult: ...
+    def move_many(self, moves: Sequence[tuple[CoordinateHolderProtocol, CustomVec2i]]) -> list[PlaceToPositionResult]: ...
+    def can_occupy(self, coordinate_holder: CoordinateHolderProtocol, to_place: CustomVec2i) -> bool: ...
+    def get_terrain(self, coordinates: CustomVec2i) -> TerrainTypes: ...
+    def set_terrain(self, coordinates: CustomVec2i, terrain: TerrainTypes) -> bool: ...
+    def promote_terrain(
+            self,
+            coordinates: CustomVec2i,
+            factory: Callable[[CustomVec2i, TerrainTypes], CoordinateHolderProtocol],
+    ) -> CoordinateHolderProtocol | None: ...
+    def region_version(self, region: tuple[int, int]) -> int: ...
+    def passable_probe(self, coordinate_holder: CoordinateHolderProtocol) -> Callable[[int, int], bool]: ...
+    def blocked_tiles(self, coordinate_holder: CoordinateHolderProtocol, region: tuple[int, int]) -> int: ...
+    def terrain_probe(self) -> Callable[[int, int], bool]: ...
+    def passable_window(self, left: int, bottom: int, width: int, height: int) -> bytearray: ...
+    def opacity_probe(self) -> Callable[[int, int], bool]: ...
+    def query_rect(self, min_corner: CustomVec2i, max_corner: CustomVec2i) -> Iterator[CoordinateHolderProtocol]: ...
+    def query_radius(self, center: CustomVec2i, radius: float) -> Iterator[CoordinateHolderProtocol]: ...
+    def nearest(
+            self,
+            center: CustomVec2i,
+            predicate: Callable[[CoordinateHolderProtocol], bool] | None = None,
+            max_radius: float | None = None,
+    ) -> CoordinateHolderProtocol | None: ...
+    def advance_tick(self) -> int: ...
+    def add_reader(self, reader: str, since_tick: int | None = None) -> None: ...
+    def mark_read(self, reader: str, tick: int) -> None: ...
+    def remove_reader(self, reader: str) -> bool: ...
+    def changed_regions(self, since_tick: int) -> list[tuple[int, int]]: ...
+    def dirty_blocks(self, region: tuple[int, int], since_tick: int) -> int: ...
+    def changes_since(self, since_tick: int) -> list[GridChange] | None: ...
@@ -2,6 +2,7 @@ from collections import deque
 from typing import runtime_checkable, Protocol, Optional
 
 from app.behaviours.types import BehaviourAction
+from app.engine.message_broker.pending_actors import PendingActors
 from app.engine.message_broker.types import Message
 from app.protocols.objects.actor_protocol import ActorProtocol
 
@@ -11,6 +12,7 @@ class MessageBrokerProtocol(Protocol):
 
     last_message_number: int
     promise_queue: dict[int, deque[BehaviourAction]]
+    pending_actors: PendingActors
 
     def clear_history(self) -> None: ...
     def send_message(self, message: Message, responder: ActorProtocol) -> int: ...
@@ -15,6 +15,7 @@ class ActorProtocol(ComponentProtocol, Protocol):
     is_active: bool
     is_deleted: bool
     pending_actions: deque[BehaviourAction]
+    is_pending: bool
     behaviours: BehaviourCollectionProtocol
     behaviour_state: BehaviourStateStore
 
@@ -0,0 +1,17 @@
+"""
+Load a module as it was at another git revision, to benchmark before and after a change
+in one run. The old source is executed under its own module name; everything it imports
+comes from the working tree.
+"""
+import subprocess
+import sys
+import types
+
+
+def load_module_at(revision: str, path: str, name: str) -> types.ModuleType:
+    source = subprocess.check_output(["git", "show", f"{revision}:{path}"])
+    module = types.ModuleType(name)
+    module.__file__ = f"{revision}:{path}"
+    sys.modules[name] = module  # dataclasses look their module up while building the class
+    exec(compile(source, module.__file__, "exec"), module.__dict__)
+    return module
@@ -0,0 +1,39 @@
+"""
+Emits per second of AtMostOnce events nobody subscribes to, as Grid.place and
+Actor.activate send for every wall at level load.
+"Before" is the bus of the commit preceding the fast path, which built an
+Envelope and read the clock first.
+
+    python -m bench.emit_unheard
+"""
+import time
+
+from app.core.event_bus.bus import EventBus
+from app.core.event_bus.events import Events
+from bench.baseline import load_module_at
+
+EMITS = 500_000
+
+
+def measure(bus_class) -> float:
+    bus = bus_class()
+    # someone listens to another event, as in a running game
+    bus.subscribe(Events.MoveCoordinateHolder, lambda _: None)
+    emit, event, payload = bus.emit, Events.RegisterCoordinateHolder, object()
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(EMITS):
+            emit(event, payload)
+        best = min(best, time.perf_counter() - started)
+    return EMITS / best
+
+
+def main():
+    before = load_module_at("d490687", "app/core/event_bus/bus.py", "bench_before_fast_path_bus").EventBus
+    for label, bus_class in (("before", before), ("after", EventBus)):
+        print(f"{label:7s} {measure(bus_class) / 1e6:5.2f} M emits/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Routed emit latency against the number of routed subscribers for the event.
+
+Every CoordinateHolder subscribes to Events.ShapeAnimationUpdate on its own route, so
+the subscriber count follows the actor count. Each emit targets one route, round robin.
+"Baseline" is the bus before subscriptions were indexed by (event, route).
+
+    python -m bench.event_bus_emit
+"""
+import time
+
+from app.core.event_bus.bus import EventBus
+from app.core.event_bus.events import Events
+from bench.baseline import load_module_at
+
+SUBSCRIBERS = (100, 1_000, 10_000, 50_000)
+EMITS = 20_000
+# the baseline scans every subscription per emit: fewer emits keep it bearable
+BASELINE_EMITS = 200
+
+
+def measure(bus_class, subscribers: int, emits: int) -> float:
+    bus = bus_class()
+    calls = [0]
+
+    def on_update(_):
+        calls[0] += 1
+
+    for i in range(subscribers):
+        bus.subscribe(Events.ShapeAnimationUpdate, on_update, f"c{i}")
+    routes = [f"c{i % subscribers}" for i in range(emits)]
+    emit, event = bus.emit, Events.ShapeAnimationUpdate
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        for route in routes:
+            emit(event, None, route=route)
+        best = min(best, time.perf_counter() - started)
+    assert calls[0] == 3 * emits
+    return best / emits * 1e6
+
+
+def main():
+    baseline = load_module_at("5179abf", "app/core/event_bus/bus.py", "bench_baseline_bus").EventBus
+    for subscribers in SUBSCRIBERS:
+        old = measure(baseline, subscribers, BASELINE_EMITS)
+        new = measure(EventBus, subscribers, EMITS)
+        print(f"{subscribers:7d} subscribers  baseline {old:9.2f} us/emit  indexed {new:6.2f} us/emit")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+"Can I enter this tile" probes per second, on a 50x38 level and a 2000x2000 map.
+
+A fifth of the tiles are walls, plus 500 blocking units; one soldier probes random
+tiles. The occupancy layer is read through Grid.can_occupy and Grid.is_may_be_occupied.
+"Baseline" is the grid before the layer: a Cell object per tile with walls as holders,
+loaded from git. Building its 4M Cells for the big map takes minutes and about 2 GB.
+
+    python -m bench.grid_probes
+"""
+import random
+import time
+
+from app.components.objects.coordinate_holder import CoordinateHolder
+from app.components.physics.body import Body, CollisionMatrix, CollisionResponse
+from app.core.event_bus.bus import EventBus
+from app.core.vectors import CustomVec2i
+from app.engine.grid.grid import Grid
+from app.engine.grid.types import TerrainTypes
+from bench.baseline import load_module_at
+
+SIZES = ((50, 38), (2000, 2000))
+WALLS = 0.2
+UNITS = 500
+PROBES = 200_000
+
+
+def blocking(coordinates: CustomVec2i, name: str) -> CoordinateHolder:
+    return CoordinateHolder(Body(CollisionMatrix(CollisionResponse.BLOCK)), None, coordinates, name)
+
+
+def populate(grid, width: int, height: int, walls_as_terrain: bool, rng: random.Random):
+    tiles = rng.sample(range(width * height), int(width * height * WALLS) + UNITS)
+    for i, tile in enumerate(tiles):
+        coordinates = CustomVec2i(tile % width, tile // width)
+        if walls_as_terrain and i >= UNITS:
+            grid.set_terrain(coordinates, TerrainTypes.WALL)
+        else:
+            grid._place(blocking(coordinates, f"b{i}"), coordinates)  # no sprite to register
+
+
+def measure(probe, mover, targets) -> float:
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        for target in targets:
+            probe(mover, target)
+        best = min(best, time.perf_counter() - started)
+    return len(targets) / best
+
+
+def main():
+    old_grid = load_module_at("5179abf", "app/engine/grid/grid.py", "bench_baseline_grid")
+    old_grid.Cell = load_module_at("5179abf", "app/engine/grid/cell.py", "bench_baseline_cell").Cell
+    for width, height in SIZES:
+        rng = random.Random(1)
+        targets = [CustomVec2i(rng.randrange(width), rng.randrange(height)) for _ in range(PROBES)]
+        mover = blocking(CustomVec2i(0, 0), "soldier")
+        results = []
+        grid = old_grid.Grid(width, height)
+        grid.event_bus = EventBus()
+        populate(grid, width, height, False, random.Random(2))
+        results.append(("baseline is_may_be_occupied", measure(grid.is_may_be_occupied, mover, targets)))
+        grid = Grid(width, height)
+        grid.event_bus = EventBus()
+        populate(grid, width, height, True, random.Random(2))
+        results.append(("layer is_may_be_occupied", measure(grid.is_may_be_occupied, mover, targets)))
+        results.append(("layer can_occupy", measure(grid.can_occupy, mover, targets)))
+        for label, rate in results:
+            print(f"{f'{width}x{height}':10s} {label:28s} {rate / 1e6:5.2f} M probes/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Dense crowds in one-tile corridors: moves applied one at a time against MoveResolver.
+
+5000 units, 100 per corridor, with walls between corridors. One-way: every unit steps right.
+Pairs: neighbours face each other, so swaps and contests between pairs.
+"Sequential" is the path before MoveResolver: Grid.move per unit in a shuffled
+pipeline order, with one retry of the refused ones.
+
+    python -m bench.move_resolver
+"""
+import random
+import time
+
+from app.components.objects.coordinate_holder import CoordinateHolder
+from app.components.physics.body import Body, CollisionMatrix, CollisionResponse
+from app.core.event_bus.bus import EventBus
+from app.core.vectors import CustomVec2i
+from app.engine.grid.grid import Grid
+from app.engine.grid.move_resolver import MoveResolver
+from app.engine.grid.types import TerrainTypes
+
+LANES, LENGTH, PER_LANE = 50, 160, 100
+TICKS = 10
+
+
+def build(pairs: bool):
+    grid = Grid(LENGTH, LANES * 2)
+    grid.event_bus = EventBus()
+    for lane in range(LANES):
+        for x in range(LENGTH):
+            grid.set_terrain(CustomVec2i(x, lane * 2 + 1), TerrainTypes.WALL)
+    units = []
+    for lane in range(LANES):
+        for i in range(PER_LANE):
+            unit = CoordinateHolder(Body(CollisionMatrix(CollisionResponse.BLOCK)), None, CustomVec2i(i, lane * 2), f"u{lane:02d}_{i:03d}")
+            grid.place(unit, unit.coordinates)
+            units.append(unit)
+    right, left = CustomVec2i(1, 0), CustomVec2i(-1, 0)
+    directions = {unit.name: left if pairs and unit.coordinates.x % 2 else right for unit in units}
+    return grid, units, directions
+
+
+def sequential(grid, units, directions, rng) -> int:
+    order = units[:]
+    rng.shuffle(order)
+    moved, retry = 0, []
+    for unit in order:
+        if grid.move(unit, unit.coordinates + directions[unit.name]).placed:
+            moved += 1
+        else:
+            retry.append(unit)
+    for unit in retry:
+        moved += grid.move(unit, unit.coordinates + directions[unit.name]).placed
+    return moved
+
+
+def simultaneous(resolver, units, directions, rng) -> int:
+    order = units[:]
+    rng.shuffle(order)
+    for unit in order:
+        resolver.submit(unit, directions[unit.name], 1)
+    return sum(result.placed for _, result in resolver.resolve())
+
+
+def main():
+    for pairs in (False, True):
+        for mode in ("sequential", "resolver"):
+            grid, units, directions = build(pairs)
+            resolver = MoveResolver(grid)
+            rng = random.Random(1)
+            times, moves = [], []
+            for _ in range(TICKS):
+                started = time.perf_counter()
+                if mode == "sequential":
+                    moves.append(sequential(grid, units, directions, rng))
+                else:
+                    moves.append(simultaneous(resolver, units, directions, rng))
+                times.append(time.perf_counter() - started)
+            tick = min(times)
+            mean_moves = sum(moves) / len(moves)
+            per_move = f"{tick / mean_moves * 1e6:6.1f} us/move" if mean_moves else "     - us/move"
+            print(f"{'pairs' if pairs else 'one-way':8s} {mode:10s} {tick * 1e3:7.1f} ms/tick  "
+                  f"{mean_moves:6.0f} moves/tick  {per_move}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+One game tick of the command pipeline at 10, 1,000 and 20,000 actors.
+
+Half the actors are Units with DiscreteMover, half StaticObjects, on a 512x512 grid.
+Each tick 50 units are told to step, the pipeline runs their actions and the moves
+are committed. "Flush scan" is the pipeline before the pending-actor set, loaded from
+git: it filtered the whole actor collection for pending actions after every action.
+
+    python -m bench.pipeline_tick
+"""
+import random
+import time
+
+from app.behaviours.moveable.discrete_mover import DiscreteMover  # registers the behaviour
+from app.collections.actor_collection import ActorCollection
+from app.components.objects.static_object import StaticObject
+from app.components.objects.unit import Unit
+from app.components.physics.body import Body, CollisionMatrix, CollisionResponse
+from app.config import Behaviours
+from app.core.vectors import CustomVec2i
+from app.engine.command_pipeline.pipeline import CommandPipeline
+from app.engine.grid.grid import Grid
+from app.engine.message_broker.broker import MessageBroker
+from app.engine.message_broker.types import Message, MessageBody, MessageTypes, MovePayload
+from app.registry.behaviour_registry import get_behaviour_registry
+from bench.baseline import load_module_at
+
+SIZE = 512
+ACTORS = (10, 1_000, 20_000)
+ORDERS = 50
+TICKS = 20
+
+
+def build(actors: int, rng: random.Random):
+    grid = Grid(SIZE, SIZE)
+    broker = MessageBroker()
+    base_behaviour = get_behaviour_registry().get(Behaviours.BEHAVIOUR)
+    base_behaviour.register_grid(grid)
+    base_behaviour.register_messenger(broker)
+    collection = ActorCollection()
+    units = []
+    for i, tile in enumerate(rng.sample(range(SIZE * SIZE), actors)):
+        coordinates = CustomVec2i(tile % SIZE, tile // SIZE)
+        body = Body(CollisionMatrix(CollisionResponse.BLOCK))
+        if i % 2:
+            actor = StaticObject(body=body, shape=None, coordinates=coordinates)
+        else:
+            actor = Unit(body=body, shape=None, coordinates=coordinates)
+            actor.add_behaviour(Behaviours.DISCRETE_MOVER)
+            units.append(actor)
+        grid._place(actor, coordinates)  # no sprite to register
+        actor.is_active = True  # activate() registers a sprite
+        collection.add(actor)
+    return broker, base_behaviour.get_movement_utils(), collection, units
+
+
+def tick(broker, movement_utils, pipeline, units, rng, flush_scan: bool) -> float:
+    started = time.perf_counter()
+    for unit in rng.sample(units, min(ORDERS, len(units))):
+        direction = rng.choice((CustomVec2i.up(), CustomVec2i.down(), CustomVec2i.left(), CustomVec2i.right()))
+        broker.send_message(Message("bench", MessageBody(MessageTypes.INTENTION_TO_MOVE_DISCRETE, MovePayload(direction))), unit)
+    pipeline.process(broker.pending_actors.drain())
+    if flush_scan:
+        broker.pending_actors.drain()  # the old pipeline never looked at the set
+    movement_utils.commit_moves()
+    return time.perf_counter() - started
+
+
+def main():
+    old_pipeline = load_module_at("34fc799", "app/engine/command_pipeline/pipeline.py", "bench_flush_scan_pipeline")
+    for actors in ACTORS:
+        for label, flush_scan in (("flush scan", True), ("pending set", False)):
+            rng = random.Random(1)
+            broker, movement_utils, collection, units = build(actors, rng)
+            if flush_scan:
+                pipeline = old_pipeline.CommandPipeline()
+                pipeline.actor_collection = collection
+            else:
+                pipeline = CommandPipeline()
+                pipeline.pending_actors = broker.pending_actors
+            best = min(tick(broker, movement_utils, pipeline, units, rng, flush_scan) for _ in range(TICKS))
+            print(f"{actors:6d} actors  {label:11s} {best * 1e3:7.2f} ms/tick")
+
+
+if __name__ == "__main__":
+    main()
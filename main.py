@@ -1,9 +1,13 @@
 import sys
 import os
 import argparse
+import atexit
 
+from app import config as cfg
 from app.application import Application
 from app.core.debug import Debug
+from app.core.event_bus.bus import bus
+from app.core.event_bus.trace import EventTrace
 
 sys.path.append(os.path.dirname(__file__))
 
@@ -11,10 +15,23 @@ sys.path.append(os.path.dirname(__file__))
 def main():
     parser = argparse.ArgumentParser(description='Tactical Game Engine')
     parser.add_argument('--debug', action='store_true', help='Enable debug output')
+    parser.add_argument('--profile-bus', nargs='?', const='bus_profile.json', metavar='PATH',
+                        help='Record event bus statistics and dump them as JSON at exit')
+    parser.add_argument('--trace-bus', nargs='?', const='traces', metavar='DIR',
+                        help='Keep a ring buffer of emitted events, dumped to DIR on frame hitches and on F9')
     args = parser.parse_args()
     
     if args.debug:
         Debug.enable()
+
+    if args.profile_bus:
+        profiler = bus.enable_profiling()
+        atexit.register(profiler.dump, args.profile_bus)
+        Debug.log(f"Event bus profiling enabled, dumping to {args.profile_bus}", __file__)
+
+    if args.trace_bus:
+        bus.enable_tracing(EventTrace(cfg.TRACE_CAPACITY, cfg.TRACE_HITCH_THRESHOLD, args.trace_bus))
+        Debug.log(f"Event bus tracing enabled, dumping to {args.trace_bus}", __file__)
     
     Debug.log("Starting Tactical Game Engine...", __file__)
     app = Application(debug=args.debug)
@@ -0,0 +1,44 @@
+import gc
+import tracemalloc
+
+from app.collections.name_repository import name_repository
+from app.components.objects.coordinate_holder import CoordinateHolder
+from app.components.physics.body import Body
+from app.core.event_bus.bus import EventBus
+from app.core.event_bus.events import Events
+from app.core.vectors import CustomVec2i
+
+
+def _spawn_and_delete(count: int, batch: int = 1000):
+    for _ in range(count // batch):
+        holders = [CoordinateHolder(Body(), None, CustomVec2i(i, 0)) for i in range(batch)]
+        for holder in holders:
+            holder.delete()
+        del holders
+
+
+def test_spawn_and_delete_returns_memory_to_baseline():
+    _spawn_and_delete(2000)  # warm up caches and interned strings
+    gc.collect()
+    names = len(name_repository.names)
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        _spawn_and_delete(100_000)
+        gc.collect()
+        grown = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+
+    assert len(name_repository.names) == names
+    assert grown < 256 * 1024, f"{grown} bytes kept after 100k spawn/delete"
+
+
+def test_purge_component_drops_pattern_subscriptions():
+    bus = EventBus()
+    holder = CoordinateHolder(Body(), None, CustomVec2i(0, 0))
+    holder.event_bus = bus
+    bus.subscribe(Events.ShapeAnimationUpdate, holder.sprite_animation_emitter, route="layer/objects/#")
+
+    assert bus.purge_component(holder) == 1
+    assert Events.ShapeAnimationUpdate not in bus._pattern_subs
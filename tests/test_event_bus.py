@@ -0,0 +1,60 @@
+import app.core.event_bus.types as event_types
+from app.core.event_bus.bus import EventBus
+from app.core.event_bus.consumer import Consumer
+from app.core.event_bus.events import Events
+
+
+def _recording_bus(*evs: Events) -> tuple[EventBus, list]:
+    bus = EventBus()
+    received = []
+    for ev in evs:
+        bus.subscribe(ev, lambda payload, ev=ev: received.append((ev, payload)))
+    return bus, received
+
+
+def test_deferred_holds_back_only_coalescable_events():
+    bus, received = _recording_bus(Events.MoveCoordinateHolder, Events.TerrainUpdate)
+    first = event_types.ObjectPositionPayload("unit", None)
+    last = event_types.ObjectPositionPayload("unit", None)
+    with bus.deferred():
+        bus.emit(Events.MoveCoordinateHolder, first)
+        bus.emit(Events.MoveCoordinateHolder, last)
+        bus.emit(Events.TerrainUpdate, "terrain")
+        assert received == [(Events.TerrainUpdate, "terrain")]
+
+    assert received == [(Events.TerrainUpdate, "terrain"), (Events.MoveCoordinateHolder, last)]
+
+
+def test_deferred_payload_without_key_is_queued_uncoalesced():
+    bus, received = _recording_bus(Events.MotionUpdate)
+    with bus.deferred():
+        bus.emit(Events.MotionUpdate, "first")
+        bus.emit(Events.MotionUpdate, "second")
+
+    assert received == [(Events.MotionUpdate, "first"), (Events.MotionUpdate, "second")]
+
+
+def test_unregister_handler_keeps_a_different_handler():
+    bus, received = _recording_bus()
+    consumer = Consumer()
+    consumer.register_event_bus(bus)
+    consumer.register_handler(Events.TerrainUpdate, received.append)
+
+    assert not consumer.unregister_handler(Events.TerrainUpdate, print)
+    bus.emit(Events.TerrainUpdate, "kept")
+    assert consumer.unregister_handler(Events.TerrainUpdate, received.append)
+    bus.emit(Events.TerrainUpdate, "dropped")
+
+    assert received == ["kept"]
+
+
+def test_profiler_counts_coalesced_emits():
+    bus, received = _recording_bus(Events.MoveCoordinateHolder)
+    profiler = bus.enable_profiling()
+    with bus.deferred():
+        for _ in range(3):
+            bus.emit(Events.MoveCoordinateHolder, event_types.ObjectPositionPayload("unit", None))
+
+    stats = profiler.events[Events.MoveCoordinateHolder]
+    assert (stats.emits, stats.coalesced, stats.handlers_called) == (1, 2, 1)
+    assert len(received) == 1
@@ -0,0 +1,58 @@
+from app.components.objects.coordinate_holder import CoordinateHolder
+from app.components.objects.static_object import StaticObject
+from app.components.physics.body import Body, CollisionChannel, CollisionMatrix, CollisionResponse
+from app.core.event_bus.bus import EventBus
+from app.core.vectors import CustomVec2i
+from app.engine.grid.field_of_view import FieldOfView
+from app.engine.grid.grid import Grid
+from app.engine.grid.types import TerrainTypes
+
+
+def make_grid(event_bus: EventBus) -> Grid:
+    grid = Grid(16, 16)
+    grid.event_bus = event_bus
+    return grid
+
+
+def test_deleted_viewer_stops_revealing():
+    event_bus = EventBus()
+    grid = make_grid(event_bus)
+    scout = CoordinateHolder(Body(CollisionMatrix(CollisionResponse.BLOCK)), None, CustomVec2i(5, 5), "scout")
+    scout.event_bus = event_bus
+    grid._place(scout, scout.coordinates)
+    field_of_view = FieldOfView(grid, event_bus)
+    field_of_view.add_viewer(scout, 0, 3)
+    field_of_view.update()
+    assert field_of_view.is_visible(0, CustomVec2i(6, 5))
+
+    scout.delete()
+    field_of_view.update()
+
+    assert not field_of_view.is_visible(0, CustomVec2i(6, 5))
+    assert not field_of_view.visible_tiles(scout.name)
+    assert not field_of_view._counts[0]
+
+
+def test_promoted_wall_still_blocks_sight():
+    event_bus = EventBus()
+    grid = make_grid(event_bus)
+    for y in range(grid.height):
+        grid.set_terrain(CustomVec2i(8, y), TerrainTypes.WALL)
+    scout = CoordinateHolder(Body(CollisionMatrix(CollisionResponse.BLOCK)), None, CustomVec2i(5, 5), "scout")
+    field_of_view = FieldOfView(grid, event_bus)
+    field_of_view.add_viewer(scout, 0, 6)
+    field_of_view.update()
+    behind = CustomVec2i(10, 5)
+    assert not field_of_view.is_visible(0, behind)
+
+    def wall(coordinates: CustomVec2i, _: TerrainTypes) -> StaticObject:
+        body = Body(CollisionMatrix(category=CollisionChannel.WORLD, block_mask=CollisionChannel.ALL), opaque=True)
+        return StaticObject(body=body, shape=None, coordinates=coordinates)
+
+    promoted = grid.promote_terrain(CustomVec2i(8, 5), wall)
+    field_of_view.update()
+    assert not field_of_view.is_visible(0, behind)
+
+    grid._remove(promoted, promoted.coordinates)
+    field_of_view.update()
+    assert field_of_view.is_visible(0, behind)
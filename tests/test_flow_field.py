@@ -0,0 +1,21 @@
+import random
+
+from app.core.event_bus.bus import EventBus
+from app.core.vectors import CustomVec2i
+from app.engine.grid.grid import Grid
+from app.engine.grid.types import TerrainTypes
+
+
+def test_passable_window_matches_terrain_probe():
+    grid = Grid(50, 38)
+    grid.event_bus = EventBus()
+    rng = random.Random(1)
+    for _ in range(400):
+        terrain = rng.choice((TerrainTypes.WALL, TerrainTypes.WATER, TerrainTypes.OBSTACLE))
+        grid.set_terrain(CustomVec2i(rng.randrange(grid.width), rng.randrange(grid.height)), terrain)
+    probe = grid.terrain_probe()
+
+    # inside, straddling chunk borders, and hanging over every edge of the grid
+    for left, bottom, width, height in ((0, 0, 50, 38), (7, 9, 33, 17), (-5, -3, 20, 12), (40, 30, 16, 16), (60, 0, 4, 4)):
+        expected = bytearray(probe(x, y) for y in range(bottom, bottom + height) for x in range(left, left + width))
+        assert grid.passable_window(left, bottom, width, height) == expected
@@ -0,0 +1,62 @@
+from app.core.event_bus.bus import EventBus
+from app.core.vectors import CustomVec2i
+from app.engine.grid.grid import Grid
+from app.engine.grid.types import TerrainTypes
+
+
+def make_grid() -> Grid:
+    grid = Grid(32, 32)
+    grid.event_bus = EventBus()
+    return grid
+
+
+def test_history_is_kept_for_readers_and_pruned_after():
+    grid = make_grid()
+    grid.add_reader("minimap")
+    start = grid.tick
+    for x in range(5):
+        grid.set_terrain(CustomVec2i(x, 0), TerrainTypes.WALL)
+        grid.advance_tick()
+
+    assert len(grid.changes_since(start)) == 5
+    assert grid.dirty_blocks((0, 0), start)
+
+    grid.mark_read("minimap", grid.tick)
+    grid.advance_tick()
+    assert not grid._journal
+    assert not grid._region_logs
+    assert grid.changes_since(start) is None
+    assert grid.changes_since(grid.tick) == []
+
+
+def test_history_goes_back_to_the_slowest_reader():
+    grid = make_grid()
+    grid.add_reader("fast")
+    grid.add_reader("slow")
+    slow_since = grid.tick
+    grid.set_terrain(CustomVec2i(1, 1), TerrainTypes.WALL)
+    grid.advance_tick()
+    grid.mark_read("fast", grid.tick)
+    grid.set_terrain(CustomVec2i(20, 20), TerrainTypes.WALL)
+    grid.advance_tick()
+
+    assert [(change.x, change.y) for change in grid.changes_since(slow_since)] == [(1, 1), (20, 20)]
+
+    grid.remove_reader("slow")
+    grid.mark_read("fast", grid.tick)
+    grid.advance_tick()
+    assert not grid._journal
+    # a region changed in pruned ticks is reported dirty as a whole
+    assert grid.dirty_blocks((0, 0), slow_since) == grid.dirty_blocks((0, 0), -1) != 0
+
+
+def test_without_readers_only_the_current_tick_is_kept():
+    grid = make_grid()
+    for x in range(100):
+        grid.set_terrain(CustomVec2i(x % 32, x // 32), TerrainTypes.WALL)
+        grid.advance_tick()
+
+    assert not grid._journal
+    assert not grid._region_logs
+    grid.set_terrain(CustomVec2i(5, 1), TerrainTypes.NONE)
+    assert len(grid.changes_since(grid.tick)) == 1
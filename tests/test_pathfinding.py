@@ -0,0 +1,38 @@
+from app.components.objects.coordinate_holder import CoordinateHolder
+from app.components.physics.body import Body, CollisionMatrix, CollisionResponse
+from app.core.vectors import CustomVec2i
+from app.engine.grid.grid import Grid
+from app.engine.grid.pathfinding import Pathfinder
+from app.engine.grid.types import TerrainTypes
+
+
+def test_door_opening_in_adjacent_chunk_invalidates_failed_search():
+    grid = Grid(32, 16)
+    # a wall along the first column of the next chunk, never expanded by the search
+    for y in range(grid.height):
+        grid.set_terrain(CustomVec2i(16, y), TerrainTypes.WALL)
+    mover = CoordinateHolder(Body(CollisionMatrix(CollisionResponse.BLOCK)), None, CustomVec2i(2, 2), "mover")
+    pathfinder = Pathfinder(grid)
+    goal = CustomVec2i(20, 2)
+
+    assert pathfinder.find_path(mover, goal) is None
+
+    grid.set_terrain(CustomVec2i(16, 2), TerrainTypes.NONE)
+    path = pathfinder.find_path(mover, goal)
+    assert path is not None
+    assert (path[-2], path[-1]) == (20, 2)
+    assert pathfinder.misses == 2
+
+
+def test_search_out_of_budget_is_not_cached():
+    grid = Grid(64, 16)
+    mover = CoordinateHolder(Body(CollisionMatrix(CollisionResponse.BLOCK)), None, CustomVec2i(0, 0), "mover")
+    pathfinder = Pathfinder(grid, max_expansions=10)
+    goal = CustomVec2i(40, 10)
+
+    assert pathfinder.find_path(mover, goal) is None
+
+    pathfinder.max_expansions = 10_000
+    path = pathfinder.find_path(mover, goal)
+    assert path is not None
+    assert (path[-2], path[-1]) == (40, 10)
@@ -0,0 +1,35 @@
+import app.core.event_bus.types as event_types
+from app.core.event_bus.bus import bus
+from app.core.event_bus.events import Events
+from app.core.vectors import CustomVec2i
+from app.engine.game_view.sprite_renderer import SpriteRenderer
+from app.registry.icon_registry import Icons, get_icon_path
+
+
+def _registration(name: str, x: int) -> event_types.RegisterObjectPayload:
+    return event_types.RegisterObjectPayload(
+        object_name=name,
+        object_type=event_types.ObjectTypes.STATIC,
+        coordinates=CustomVec2i(x, 0),
+        icon_path=get_icon_path(Icons.CURSOR),
+    )
+
+
+def _sprites(renderer: SpriteRenderer) -> int:
+    return sum(len(sprite_list) for sprite_list in renderer._sprite_list)
+
+
+def test_registration_is_idempotent_per_holder():
+    renderer = SpriteRenderer(16, lambda index: index * 16 + 8)
+    renderer.register_event_bus(bus)
+    try:
+        bus.emit(Events.RegisterSprite, _registration("cursor-test", 0))
+        bus.emit(Events.RegisterCoordinateHolder, _registration("cursor-test", 1))
+        bus.emit(Events.RegisterCoordinateHolders, event_types.RegisterObjectsPayload((_registration("cursor-test", 2),)))
+        assert _sprites(renderer) == 1
+        assert renderer._animation_game_data["cursor-test"].coordinates == CustomVec2i(2, 0)
+
+        bus.emit(Events.UnregisterCoordinateHolder, event_types.ObjectPayload(object_name="cursor-test"))
+        assert _sprites(renderer) == 0
+    finally:
+        renderer.unregister_event_bus()